@@ -0,0 +1,102 @@
+"""Measure /play autocomplete lookup latency and memory of TrackSearchIndex.
+
+The index is filled to capacity with synthetic titles and artists built from
+a shared vocabulary, so common words have long posting lists as they do in
+real catalogues. Lookups replay what a user types keystroke by keystroke,
+plus typo'd queries that fall back to trigram matching. The max includes
+any garbage collection pause that lands on a lookup.
+
+Run from the repository root:
+
+    python benchmarks/bench_autocomplete.py [entries] [lookups]
+"""
+
+from __future__ import annotations
+
+import gc
+import itertools
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.search_index import TrackSearchIndex  # noqa: E402
+
+SYLLABLES = ("ka", "ra", "ma", "ti", "ho", "na", "dil", "pya", "ri", "sa", "ja", "an", "te", "mo", "la", "ye", "ve", "shi")
+
+
+def vocabulary(size: int, rng: random.Random) -> list[str]:
+    words = {"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size * 2)}
+    return sorted(words)[:size]
+
+
+def make_tracks(entries: int, rng: random.Random) -> list[tuple[str, str, str, int]]:
+    words = vocabulary(6_000, rng)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    artists = [" ".join(rng.choices(words, k=2)).title() for _ in range(800)]
+    return [
+        (
+            " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(1, 5))).title(),
+            rng.choice(artists),
+            f"https://www.jiosaavn.com/song/x/Id{i:06d}",
+            rng.randint(0, 50),
+        )
+        for i in range(entries)
+    ]
+
+
+def keystrokes(text: str) -> list[str]:
+    return [text[:end] for end in range(1, len(text) + 1)]
+
+
+def typo(text: str, rng: random.Random) -> str:
+    i = rng.randrange(len(text))
+    return text[:i] + rng.choice("aeiouxz") + text[i + 1 :]
+
+
+def main() -> None:
+    args = [int(arg) for arg in sys.argv[1:]]
+    entries = args[0] if len(args) > 0 else 20_000
+    lookups = args[1] if len(args) > 1 else 5_000
+    rng = random.Random(5)
+
+    tracks = make_tracks(entries, rng)
+    titles = [title for title, _, _, _ in tracks]
+    gc.collect()
+    tracemalloc.start()
+    index = TrackSearchIndex(max_entries=entries)
+    for title, artist, page_url, plays in tracks:
+        index.add(title, artist, page_url, plays=plays)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = index.stats()
+    print(f"{len(index):,} entries, {stats['words']:,} words, {stats['trigrams']:,} trigrams: {size / 1024**2:.1f} MiB")
+
+    queries: list[str] = [""]
+    while len(queries) < lookups:
+        title = rng.choice(titles)
+        queries.extend(keystrokes(title.lower()))
+        queries.append(typo(title.lower(), rng))
+    queries = queries[:lookups]
+
+    # The first pass also pays for lazily built per-word and short prefix lists.
+    for label in ("first pass", "repeat pass"):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            index.suggest(query)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        p50, p99 = timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+        print(
+            f"{label}: {len(queries):,} lookups: "
+            f"p50 {p50 * 1e6:.0f} us | p99 {p99 * 1e6:.0f} us | max {timings[-1] * 1e6:.0f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Compare parse+select cost per search: dict walking vs SongRecord.
+
+A synthetic /api/search/songs payload with 20 results, shaped like the real
+API (album and artist objects, three image sizes, five download qualities),
+is decoded and turned into the picked track plus the normalized keys that
+similar-track filtering needs. The baseline is the pipeline the client
+used before song records: json.loads, then per-character loops over dicts.
+Also reports how much memory one cached search result list holds.
+
+Decoding is most of the per-search time, so the speedup is modest (about
+1.2-1.5x); the larger win is the ~5x smaller cached result list.
+
+Run from the repository root:
+
+    python benchmarks/bench_parse.py [results] [runs]
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import sys
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.music_state import Track  # noqa: E402
+from core.jsonutil import loads, orjson  # noqa: E402
+from core.song_records import parse_songs  # noqa: E402
+
+QUALITIES = ("12kbps", "48kbps", "96kbps", "160kbps", "320kbps")
+IMAGE_SIZES = ("50x50", "150x150", "500x500")
+
+
+def make_payload(results: int) -> bytes:
+    songs = []
+    for i in range(results):
+        song_id = f"Xy{i:04d}AbCd"
+        artist = {
+            "id": f"{4000 + i}",
+            "name": f"Artist &quot;{i % 7}&quot;",
+            "role": "primary_artists",
+            "type": "artist",
+            "image": [{"quality": size, "url": f"https://c.saavncdn.com/artists/a{i}_{size}.jpg"} for size in IMAGE_SIZES],
+            "url": f"https://www.jiosaavn.com/artist/artist-{i}/abc{i}",
+        }
+        songs.append(
+            {
+                "id": song_id,
+                "name": f"Song Title {i} (From &quot;Some Movie&quot;)",
+                "type": "song",
+                "year": "2023",
+                "releaseDate": None,
+                "duration": 180 + i,
+                "label": "Some Label",
+                "explicitContent": False,
+                "playCount": str(100_000 * (results - i)),
+                "language": "hindi",
+                "hasLyrics": False,
+                "lyricsId": None,
+                "url": f"https://www.jiosaavn.com/song/song-title-{i}/{song_id}",
+                "copyright": "(P) 2023 Some Label",
+                "album": {"id": f"{9000 + i}", "name": f"Some Movie {i}", "url": f"https://www.jiosaavn.com/album/m/{i}"},
+                "artists": {"primary": [artist], "featured": [], "all": [artist, dict(artist, role="music")]},
+                "image": [{"quality": size, "url": f"https://c.saavncdn.com/{i:03d}/cover-{size}.jpg"} for size in IMAGE_SIZES],
+                "downloadUrl": [
+                    {"quality": quality, "url": f"https://aac.saavncdn.com/{i:03d}/{song_id}_{quality[:-4]}.mp4"}
+                    for quality in QUALITIES
+                ],
+            }
+        )
+    payload = {"success": True, "data": {"total": results, "start": 0, "results": songs}}
+    return json.dumps(payload).encode()
+
+
+def _quality_value(item: dict[str, str]) -> int:
+    digits = "".join(ch for ch in item.get("quality", "") if ch.isdigit())
+    return int(digits) if digits else 0
+
+
+def _normalize_text(text: str) -> str:
+    return "".join(ch.lower() for ch in text if ch.isalnum() or ch.isspace()).strip()
+
+
+def _play_count(song: dict[str, Any]) -> int:
+    value = song.get("playCount")
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    return value if isinstance(value, int) else 0
+
+
+def baseline(body: bytes) -> tuple[Track | None, list[str]]:
+    songs = json.loads(body)["data"]["results"]
+    keys = []
+    for song in songs:
+        primary = song.get("artists", {}).get("primary") or []
+        artist = _normalize_text(primary[0].get("name", "")) if primary else ""
+        keys.append(f"{_normalize_text(str(song.get('name', '')))}|{artist}")
+    song = max(songs, key=_play_count)
+    downloads = song.get("downloadUrl") or []
+    if not downloads:
+        return None, keys
+    primary = song.get("artists", {}).get("primary") or []
+    track = Track(
+        title=html.unescape(song.get("name", "Unknown Title")),
+        stream_url=max(downloads, key=_quality_value).get("url"),
+        page_url=song.get("url", ""),
+        artist=html.unescape(primary[0].get("name", "Unknown Artist") if primary else "Unknown Artist"),
+        duration=int(song.get("duration") or 0),
+        image_url=max(song.get("image") or [{}], key=_quality_value).get("url"),
+        song_id=song.get("id"),
+        stream_resolved_at=time.time(),
+    )
+    return track, keys
+
+
+def records(body: bytes) -> tuple[Track | None, list[str]]:
+    parsed = parse_songs(loads(body)["data"]["results"])
+    keys = [f"{record.norm_title}|{record.norm_artist}" for record in parsed]
+    if not parsed:
+        return None, keys
+    return max(parsed, key=lambda record: record.play_count).to_track(), keys
+
+
+def cached_bytes(build: Any) -> int:
+    """Memory held by one cached search result list."""
+    tracemalloc.start()
+    kept = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def main() -> None:
+    args = [int(arg) for arg in sys.argv[1:]]
+    results = args[0] if len(args) > 0 else 20
+    runs = args[1] if len(args) > 1 else 5_000
+    body = make_payload(results)
+    print(f"{results} results, {len(body):,} byte payload, JSON backend: {'orjson' if orjson else 'json'}")
+
+    old_track, old_keys = baseline(body)
+    new_track, new_keys = records(body)
+    assert old_track and new_track and old_track.stream_url == new_track.stream_url
+    # Keys differ only where the old pipeline normalized HTML entities ("&quot;") into the title.
+    assert old_track.image_url == new_track.image_url and len(old_keys) == len(new_keys)
+
+    old = timeit.timeit(lambda: baseline(body), number=runs) / runs * 1e6
+    new = timeit.timeit(lambda: records(body), number=runs) / runs * 1e6
+    print(f"parse + select per search: dicts {old:7.1f} us | SongRecord {new:7.1f} us ({old / new:.1f}x)")
+
+    old_bytes = cached_bytes(lambda: json.loads(body)["data"]["results"])
+    new_bytes = cached_bytes(lambda: parse_songs(loads(body)["data"]["results"]))
+    print(f"cached result list:        dicts {old_bytes / 1024:7.1f} KiB | SongRecord {new_bytes / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
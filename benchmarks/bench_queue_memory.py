@@ -0,0 +1,102 @@
+"""Compare memory and paging cost of deque queues against TrackQueue.
+
+Every guild queues tracks drawn from a shared catalogue of popular songs,
+as 24/7 refills and shared playlists do, and one guild holds a large
+playlist. Each enqueue builds a fresh Track, like a search result does.
+
+Run from the repository root:
+
+    python benchmarks/bench_queue_memory.py [guilds] [tracks_per_guild] [playlist_size]
+"""
+
+from __future__ import annotations
+
+import gc
+import random
+import sys
+import timeit
+import tracemalloc
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.music_state import Track, _queue_key  # noqa: E402
+from core.track_queue import TrackQueue, TrackTable  # noqa: E402
+
+CATALOGUE_SIZE = 2_000
+
+
+def make_track(song: int) -> Track:
+    # Fresh strings per call, the way each API response produces them.
+    return Track(
+        title=f"Song title number {song}",
+        stream_url=f"https://aac.saavncdn.com/{song:03d}/0123456789abcdef{song}_320.mp4?sig={song * 7919}",
+        page_url=f"https://www.jiosaavn.com/song/song-title-number-{song}/AbCdEf{song}",
+        artist=f"Artist {song % 300}",
+        duration=180 + song % 120,
+        image_url=f"https://c.saavncdn.com/{song:03d}/cover-{song}-500x500.jpg",
+        song_id=f"AbCdEf{song}",
+    )
+
+
+def build(queue_factory: Callable[[], Any], guilds: int, per_guild: int, playlist: int, seed: int = 3) -> list[Any]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(CATALOGUE_SIZE)]
+    queues = []
+    for _ in range(guilds):
+        queue = queue_factory()
+        for song in rng.choices(range(CATALOGUE_SIZE), weights, k=per_guild):
+            queue.append(make_track(song))
+        queues.append(queue)
+    big = queue_factory()
+    for song in range(playlist):
+        big.append(make_track(CATALOGUE_SIZE + song))
+    queues.append(big)
+    return queues
+
+
+def measure(queue_factory: Callable[[], Any], guilds: int, per_guild: int, playlist: int) -> tuple[list[Any], int]:
+    gc.collect()
+    tracemalloc.start()
+    queues = build(queue_factory, guilds, per_guild, playlist)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return queues, current
+
+
+def main() -> None:
+    args = [int(arg) for arg in sys.argv[1:]]
+    guilds = args[0] if len(args) > 0 else 1_000
+    per_guild = args[1] if len(args) > 1 else 20
+    playlist = args[2] if len(args) > 2 else 10_000
+    total = guilds * per_guild + playlist
+    print(f"{guilds:,} guilds x {per_guild} tracks + one {playlist:,}-track playlist = {total:,} queued tracks")
+
+    deques, deque_bytes = measure(deque, guilds, per_guild, playlist)
+    table = TrackTable(_queue_key)
+    compact, compact_bytes = measure(lambda: TrackQueue(table), guilds, per_guild, playlist)
+    print(f"deque[Track]: {deque_bytes / 1024**2:8.2f} MiB")
+    print(f"TrackQueue:   {compact_bytes / 1024**2:8.2f} MiB ({len(table):,} interned tracks)")
+
+    big_deque, big_queue = deques[-1], compact[-1]
+    middle = len(big_queue) // 2
+    runs = 2_000
+    page_deque = timeit.timeit(lambda: list(big_deque)[middle : middle + 10], number=runs) / runs * 1e6
+    page_queue = timeit.timeit(lambda: big_queue[middle : middle + 10], number=runs) / runs * 1e6
+    print(f"page of 10 at position {middle:,}: deque {page_deque:8.1f} us | TrackQueue {page_queue:6.1f} us")
+
+    def deque_move() -> None:
+        track = big_deque[middle]
+        del big_deque[middle]
+        big_deque.insert(10, track)
+
+    move_deque = timeit.timeit(deque_move, number=runs) / runs * 1e6
+    move_queue = timeit.timeit(lambda: big_queue.move(middle, 10), number=runs) / runs * 1e6
+    print(f"move position {middle:,} -> 10:      deque {move_deque:8.1f} us | TrackQueue {move_queue:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
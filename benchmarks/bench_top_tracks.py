@@ -0,0 +1,64 @@
+"""Compare full-sort top-N against CountIndex at several history sizes.
+
+Run from the repository root:
+
+    python benchmarks/bench_top_tracks.py [sizes...]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.play_store import CountIndex  # noqa: E402
+
+
+def build_counts(size: int, seed: int = 7) -> dict[str, int]:
+    rng = random.Random(seed)
+    # Long-tailed like real play history: most tracks played once or twice.
+    return {f"track-{i}": int(rng.paretovariate(1.2)) for i in range(size)}
+
+
+def full_sort_top(counts: dict[str, int], limit: int) -> list[tuple[str, int]]:
+    return sorted(counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+
+def bench(size: int, limit: int = 10) -> None:
+    counts = build_counts(size)
+    index = CountIndex(counts)
+    assert [c for _, c in index.top(limit)] == [c for _, c in full_sort_top(counts, limit)]
+
+    runs = max(3, 200_000 // size)
+    sort_ms = timeit.timeit(lambda: full_sort_top(counts, limit), number=runs) / runs * 1000
+    index_ms = timeit.timeit(lambda: index.top(limit), number=runs * 100) / (runs * 100) * 1000
+
+    keys = list(counts)
+    rng = random.Random(1)
+    picks = [rng.choice(keys) for _ in range(10_000)]
+
+    def increments() -> None:
+        for track_id in picks:
+            old = counts[track_id]
+            counts[track_id] = old + 1
+            index.move(track_id, old, old + 1)
+
+    move_us = timeit.timeit(increments, number=1) / len(picks) * 1_000_000
+
+    print(
+        f"{size:>9,} tracks | sorted() top-{limit}: {sort_ms:9.3f} ms"
+        f" | index top-{limit}: {index_ms:7.4f} ms | index increment: {move_us:5.2f} us"
+    )
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for size in sizes:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
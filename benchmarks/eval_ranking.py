@@ -0,0 +1,78 @@
+"""Score result selection on hand-built search fixtures.
+
+Each case in benchmarks/fixtures/search_ranking.json pairs a query with a
+synthetic result list shaped like the API's and the song the query means.
+The cases were written while tuning SongRanker, so they check known cases
+rather than measure accuracy on real traffic. Reports how often the old
+play count pick and SongRanker choose that song, lists the misses, and
+times ranking per search with a cold and a warm token cache.
+
+Run from the repository root:
+
+    python benchmarks/eval_ranking.py [fixture.json] [runs]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.ranking import SongRanker  # noqa: E402
+from core.song_records import SongRecord, parse_songs  # noqa: E402
+
+DEFAULT_FIXTURE = Path(__file__).resolve().parent / "fixtures" / "search_ranking.json"
+
+
+def by_play_count(records: list[SongRecord], query: str) -> SongRecord | None:
+    """The selection used before query-aware ranking."""
+    return max(records, key=lambda record: record.play_count, default=None)
+
+
+def evaluate(name: str, pick: Callable[[list[SongRecord], str], SongRecord | None], cases: list[tuple]) -> None:
+    misses = []
+    for query, expected, records in cases:
+        picked = pick(records, query)
+        if picked is None or picked.song_id != expected:
+            misses.append((query, picked.title if picked else None))
+    correct = len(cases) - len(misses)
+    print(f"{name:<12} {correct}/{len(cases)} correct ({correct / len(cases):.0%})")
+    for query, title in misses:
+        print(f"  miss: {query!r} -> {title!r}")
+
+
+def main() -> None:
+    fixture = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FIXTURE
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    data = json.loads(fixture.read_text(encoding="utf-8"))
+    cases = [(case["query"], case["expected"], parse_songs(case["results"])) for case in data["cases"]]
+    print(f"{len(cases)} synthetic searches from {fixture.name}")
+
+    evaluate("play count", by_play_count, cases)
+    evaluate("SongRanker", SongRanker().best, cases)
+
+    def cold() -> None:
+        ranker = SongRanker()
+        for query, _, records in cases:
+            ranker.best(records, query)
+
+    warm_ranker = SongRanker()
+
+    def warm() -> None:
+        for query, _, records in cases:
+            warm_ranker.best(records, query)
+
+    warm()
+    per_search = 1e6 / (runs * len(cases))
+    cold_us = timeit.timeit(cold, number=runs) * per_search
+    warm_us = timeit.timeit(warm, number=runs) * per_search
+    baseline_us = timeit.timeit(lambda: [by_play_count(r, q) for q, _, r in cases], number=runs) * per_search
+    print(f"per search: play count {baseline_us:6.1f} us | ranker cold {cold_us:6.1f} us | ranker warm {warm_us:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,17 @@ import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from core.audio import AudioSourceFactory
+from core.audio_cache import AudioDiskCache
+from core.audio_workers import AudioWorkerPool
+from core.http import create_session
+from core.jiosaavn import JioSaavnClient
+from core.music_state import PlayCountManager
+from core.play_store import create_play_count_store
+from core.search_index import TrackSearchIndex
+from core.shared_audio import SharedAudioRegistry
+from core.stream_urls import StreamUrlResolver
+
 
 class ChordBot(commands.Bot):
     def __init__(self) -> None:
@@ -24,7 +35,26 @@ class ChordBot(commands.Bot):
         jiosaavn_base_url = os.getenv("JIOSAAVN_API_BASE_URL", "").strip()
         if not jiosaavn_base_url:
             raise RuntimeError("JIOSAAVN_API_BASE_URL is missing in .env")
-        self.jiosaavn_base_url = jiosaavn_base_url.rstrip("/")
+        # A comma-separated list of mirrors; requests go to the fastest healthy one.
+        self.jiosaavn_base_urls = [url.strip().rstrip("/") for url in jiosaavn_base_url.split(",") if url.strip()]
+        self.jiosaavn = JioSaavnClient(
+            self.jiosaavn_base_urls,
+            cache_size=max(0, int(os.getenv("SEARCH_CACHE_SIZE", "512"))),
+            cache_ttl=max(0.0, float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))),
+            negative_cache_ttl=max(0.0, float(os.getenv("SEARCH_CACHE_NEGATIVE_TTL_SECONDS", "30"))),
+            stale_ttl=max(0.0, float(os.getenv("SEARCH_CACHE_STALE_TTL_SECONDS", "3600"))),
+            retries=max(0, int(os.getenv("API_RETRIES", "2"))),
+            breaker_threshold=max(1, int(os.getenv("API_BREAKER_THRESHOLD", "5"))),
+            breaker_reset_seconds=max(1.0, float(os.getenv("API_BREAKER_RESET_SECONDS", "30"))),
+            hedge=os.getenv("API_HEDGE", "true").lower() in {"1", "true", "yes", "on"},
+        )
+        # Tracks seen in searches and play history, for /play autocomplete.
+        self.search_index = TrackSearchIndex(max_entries=max(1, int(os.getenv("SEARCH_INDEX_MAX_ENTRIES", "20000"))))
+        self.jiosaavn.record_listeners.append(self.search_index.add_records)
+        self.stream_urls = StreamUrlResolver(
+            self.jiosaavn,
+            default_ttl=max(0.0, float(os.getenv("STREAM_URL_DEFAULT_TTL_SECONDS", "21600"))),
+        )
         self.auto_delete_enabled = os.getenv("AUTO_DELETE_ENABLED", "true").lower() in {
             "1",
             "true",
@@ -32,6 +62,39 @@ class ChordBot(commands.Bot):
             "on",
         }
         self.auto_delete_seconds = max(0, int(os.getenv("AUTO_DELETE_SECONDS", "12")))
+        audio_workers = max(0, int(os.getenv("AUDIO_WORKERS", "0")))
+        self.audio_sources = AudioSourceFactory(
+            bitrate=max(8, int(os.getenv("FFMPEG_BITRATE", "128"))),
+            threads=max(0, int(os.getenv("FFMPEG_THREADS", "0"))),
+            compression_level=min(10, max(0, int(os.getenv("FFMPEG_COMPRESSION_LEVEL", "2")))),
+            probe=os.getenv("FFMPEG_PROBE", "true").lower() in {"1", "true", "yes", "on"},
+            shared=(
+                SharedAudioRegistry(grace_seconds=max(0.0, float(os.getenv("SHARED_AUDIO_GRACE_SECONDS", "60"))))
+                if os.getenv("SHARED_AUDIO", "false").lower() in {"1", "true", "yes", "on"}
+                else None
+            ),
+            disk_cache=(
+                AudioDiskCache(
+                    directory=os.getenv("AUDIO_CACHE_DIR", "data/audio_cache"),
+                    max_bytes=max(0, int(os.getenv("AUDIO_CACHE_MAX_MB", "2048"))) * 1024 * 1024,
+                    min_plays=max(1, int(os.getenv("AUDIO_CACHE_MIN_PLAYS", "5"))),
+                    bitrate=max(8, int(os.getenv("FFMPEG_BITRATE", "128"))),
+                )
+                if os.getenv("AUDIO_CACHE_ENABLED", "false").lower() in {"1", "true", "yes", "on"}
+                else None
+            ),
+            workers=(
+                AudioWorkerPool(audio_workers, window=int(os.getenv("AUDIO_WORKER_WINDOW", "250")))
+                if audio_workers
+                else None
+            ),
+        )
+        PlayCountManager.configure(
+            create_play_count_store(
+                os.getenv("PLAY_COUNT_BACKEND", "json"),
+                os.getenv("PLAY_COUNT_DB_PATH", "data/play_counts.db"),
+            )
+        )
         owner_id_raw = os.getenv("OWNER_ID", "").strip()
         if not owner_id_raw.isdigit():
             raise RuntimeError("OWNER_ID is missing or invalid in .env")
@@ -39,7 +102,16 @@ class ChordBot(commands.Bot):
         self.synced_once = False
 
     async def setup_hook(self) -> None:
-        self.http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20))
+        self.http_session = create_session(
+            pool_size=max(1, int(os.getenv("HTTP_POOL_SIZE", "100"))),
+            per_host=max(0, int(os.getenv("HTTP_POOL_PER_HOST", "20"))),
+            dns_cache_ttl=max(0, int(os.getenv("HTTP_DNS_CACHE_TTL_SECONDS", "300"))),
+            connect_timeout=max(0.1, float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "3"))),
+            read_timeout=max(0.1, float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "8"))),
+            total_timeout=max(0.1, float(os.getenv("HTTP_TOTAL_TIMEOUT_SECONDS", "20"))),
+        )
+        indexed = await asyncio.to_thread(self.search_index.load_history, PlayCountManager())
+        print(f"Indexed {indexed} tracks from play history for autocomplete")
 
         for file in Path("cogs").rglob("*.py"):
             if file.name.startswith("_"):
@@ -51,6 +123,11 @@ class ChordBot(commands.Bot):
         if self.http_session and not self.http_session.closed:
             await self.http_session.close()
         await super().close()
+        scheduler = getattr(self, "cleanup_scheduler", None)
+        if scheduler is not None:
+            scheduler.close()
+        self.audio_sources.close()
+        await asyncio.to_thread(PlayCountManager.shutdown)
 
 
 bot = ChordBot()
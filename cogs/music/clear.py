@@ -20,8 +20,13 @@ class ClearCog(commands.Cog):
             await reply_and_cleanup(ctx, "Queue is already empty.")
             return
 
-        count = len(state.queue)
-        state.queue.clear()
+        play_cog = self.bot.get_cog("PlayCog")
+        if play_cog is None:
+            await reply_and_cleanup(ctx, "The music player is not loaded.")
+            return
+
+        await ctx.defer()
+        count = await play_cog.submit(ctx.guild.id, "clear")
         await reply_and_cleanup(ctx, f"Cleared {count} queued song(s).")
 
 
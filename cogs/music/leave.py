@@ -20,19 +20,18 @@ class LeaveCog(commands.Cog):
             await reply_and_cleanup(ctx, "24/7 is enabled. Disable it with `247` first.")
             return
 
-        if state:
-            state.queue.clear()
-            state.now_playing = None
-
         voice_client = ctx.guild.voice_client
         if not voice_client or not voice_client.is_connected():
             await reply_and_cleanup(ctx, "I am not in a voice channel.")
             return
 
-        if voice_client.is_playing() or voice_client.is_paused():
-            voice_client.stop()
-
-        await voice_client.disconnect()
+        play_cog = self.bot.get_cog("PlayCog")
+        if play_cog is not None:
+            # Stopping clears the queue and disconnects, since 24/7 mode is off here.
+            await ctx.defer()
+            await play_cog.submit(ctx.guild.id, "stop")
+        else:
+            await voice_client.disconnect()
         await reply_and_cleanup(ctx, "Disconnected.")
 
 
@@ -20,11 +20,15 @@ class PauseCog(commands.Cog):
             await reply_and_cleanup(ctx, "I am not in a voice channel.")
             return
 
-        if not voice_client.is_playing():
+        play_cog = self.bot.get_cog("PlayCog")
+        if play_cog is None:
+            await reply_and_cleanup(ctx, "The music player is not loaded.")
+            return
+
+        if not play_cog.pause_playback(ctx.guild):
             await reply_and_cleanup(ctx, "Nothing is playing.")
             return
 
-        voice_client.pause()
         await reply_and_cleanup(ctx, "Paused.")
 
 
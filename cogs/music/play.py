@@ -2,14 +2,41 @@ from __future__ import annotations
 
 import asyncio
 import json
+import random
+import time
 from pathlib import Path
+from typing import Any, AsyncGenerator, Awaitable, Callable, Coroutine
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 
+from core.audio import AudioSourceFactory
 from core.cleanup import delete_message_by_id, make_embed, reply_and_cleanup
-from core.jiosaavn import JioSaavnClient
-from core.music_state import GuildMusicState, Track
+from core.concurrency import ordered_fanout
+from core.http import UpstreamUnavailable
+from core.jiosaavn import JioSaavnClient, link_kind, split_play_input
+from core.metrics import RollingStats
+from core.music_state import GuildMusicState, PlayerCommand, Track, track_id_for
+from core.search_index import TrackSearchIndex
+from core.stream_urls import StreamUrlResolver
+
+# Bounds for resolving 24/7 refill candidates in parallel.
+REFILL_CONCURRENCY = 4
+REFILL_TIMEOUT_SECONDS = 8.0
+# How long before the current track ends the next one is validated and pre-spawned.
+PREFETCH_LEAD_SECONDS = 15
+# Queued tracks tried in a row when starting playback before giving up until the next command.
+START_ATTEMPTS = 5
+# Player commands whose back-to-back repeats are handled once (e.g. a burst of skips).
+COALESCED_COMMANDS = {"skip", "refill", "stop", "clear"}
+# Limits for playlists and multi-query /play input.
+BULK_ENQUEUE_MAX_TRACKS = 500
+BULK_ENQUEUE_MAX_QUERIES = 25
+BULK_RESOLVE_TIMEOUT_SECONDS = 30.0
+# Background additions are handed to the player in batches of this size, or at this interval.
+ENQUEUE_BATCH_SIZE = 25
+ENQUEUE_FLUSH_SECONDS = 1.0
 
 
 def _format_duration(seconds: int) -> str:
@@ -41,14 +68,12 @@ class PlayerControls(discord.ui.View):
             await interaction.response.send_message("I am not in a voice channel.", ephemeral=True)
             return
 
-        if voice.is_paused():
-            voice.resume()
+        if self.cog.resume_playback(guild):
             button.label = "Pause"
             await interaction.response.edit_message(view=self)
             return
 
-        if voice.is_playing():
-            voice.pause()
+        if self.cog.pause_playback(guild):
             button.label = "Resume"
             await interaction.response.edit_message(view=self)
             return
@@ -58,11 +83,15 @@ class PlayerControls(discord.ui.View):
     @discord.ui.button(label="Skip", style=discord.ButtonStyle.primary)
     async def skip(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
         guild, voice = await self._guild_voice()
-        if not guild or not voice or not voice.is_connected() or (not voice.is_playing() and not voice.is_paused()):
+        if not guild or not voice or not voice.is_connected():
             await interaction.response.send_message("Nothing to skip.", ephemeral=True)
             return
-        voice.stop()
-        await interaction.response.send_message("Skipped.", ephemeral=True)
+        # The player may be busy starting a track, longer than Discord waits for a response.
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        if not await self.cog.submit(self.guild_id, "skip"):
+            await interaction.followup.send("Nothing to skip.", ephemeral=True)
+            return
+        await interaction.followup.send("Skipped.", ephemeral=True)
 
     @discord.ui.button(label="Stop", style=discord.ButtonStyle.danger)
     async def stop(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
@@ -71,33 +100,50 @@ class PlayerControls(discord.ui.View):
             await interaction.response.send_message("I am not in a voice channel.", ephemeral=True)
             return
 
-        state = self.cog._state(self.guild_id)
-        state.queue.clear()
-        state.now_playing = None
-
-        if voice.is_playing() or voice.is_paused():
-            voice.stop()
-
-        if state.mode_247:
-            await self.cog._play_most_popular_for_guild(guild)
-            await interaction.response.send_message(
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        if await self.cog.submit(self.guild_id, "stop"):
+            await interaction.followup.send(
                 "Stopped current playback. 24/7 is enabled, so I will stay connected.",
                 ephemeral=True,
             )
             return
 
-        await voice.disconnect()
-        await interaction.response.send_message("Stopped and disconnected.", ephemeral=True)
+        await interaction.followup.send("Stopped and disconnected.", ephemeral=True)
 
 
 class PlayCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.jiosaavn = JioSaavnClient(bot.jiosaavn_base_url)
+        self.jiosaavn: JioSaavnClient = bot.jiosaavn
+        self.audio_sources: AudioSourceFactory = bot.audio_sources
+        self.stream_urls: StreamUrlResolver = bot.stream_urls
+        self.search_index: TrackSearchIndex = bot.search_index
         self.now_playing_emoji_id = self._load_now_playing_emoji_id()
+        # Time from one track ending to the next one's play() call, by whether it was prefetched.
+        self.track_gap_stats = {"prefetched": RollingStats(), "cold start": RollingStats()}
+        # Time from the audio thread reporting a finished track to the player loop picking it up.
+        self.completion_handoff_stats = RollingStats()
+        self._background_tasks: set[asyncio.Task] = set()
         if not hasattr(self.bot, "music_states"):
             self.bot.music_states = {}
 
+    async def cog_load(self) -> None:
+        # Commands left behind by a previous instance's actors, e.g. after a reload.
+        for guild_id, state in self.bot.music_states.items():
+            if not state.mailbox.empty():
+                self._ensure_actor(guild_id)
+
+    async def cog_unload(self) -> None:
+        """Stop this instance's actors and prefetches; the reloaded cog starts its own."""
+        for state in self.bot.music_states.values():
+            for task in (state.worker_task, state.prefetch_task):
+                if task is not None and not task.done():
+                    task.cancel()
+            state.worker_task = None
+            state.prefetch_task = None
+            self._cancel_bulk_enqueues(state)
+            self._discard_prefetch(state)
+
     @staticmethod
     def _load_now_playing_emoji_id() -> int | None:
         config_path = Path("emoji.json")
@@ -131,7 +177,7 @@ class PlayCog(commands.Cog):
 
     def _state(self, guild_id: int) -> GuildMusicState:
         if guild_id not in self.bot.music_states:
-            self.bot.music_states[guild_id] = GuildMusicState()
+            self.bot.music_states[guild_id] = GuildMusicState(guild_id)
         return self.bot.music_states[guild_id]
 
     async def _send_to_channel(self, guild: discord.Guild, message: str) -> discord.Message | None:
@@ -179,48 +225,389 @@ class PlayCog(commands.Cog):
 
         if not voice_client or not voice_client.is_connected():
             state.now_playing = None
+            self._discard_prefetch(state)
             return
 
-        if not state.queue:
-            state.now_playing = None
+        if voice_client.is_playing() or voice_client.is_paused():
             return
 
-        track = state.queue.popleft()
-        state.now_playing = track
-
-        try:
-            source = discord.FFmpegOpusAudio(
-                track.stream_url,
-                before_options="-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5",
-                options="-vn",
-            )
-        except Exception as exc:
-            state.now_playing = None
-            await self._send_to_channel(guild, f"Playback failed: `{exc}`")
+        def after_play(err: Exception | None) -> None:
+            # Runs on discord.py's audio thread; hand the completion to the
+            # guild's player loop and return straight away.
+            state.track_finished_at = time.perf_counter()
+            self.bot.loop.call_soon_threadsafe(self._track_finished, guild.id, err)
+
+        # A track that cannot start is skipped, so one bad link or an API outage
+        # does not stall the rest of the queue; the bound stops a long failing run.
+        for _ in range(START_ATTEMPTS):
+            if not state.queue:
+                state.now_playing = None
+                self._discard_prefetch(state)
+                return
+            track = state.queue.popleft()
+            state.now_playing = track
+
+            source = self._take_prefetched_source(state, track)
+            prefetched = source is not None
+            try:
+                if source is None:
+                    source = await self._create_source(guild.id, track)
+                voice_client.play(source, after=after_play)
+                break
+            except Exception as exc:
+                state.now_playing = None
+                if source is not None:
+                    source.cleanup()
+                await self._send_to_channel(guild, f"Playback failed for **{track.title}**: `{exc}`")
+        else:
             return
 
-        def after_play(err: Exception | None) -> None:
-            fut = asyncio.run_coroutine_threadsafe(
-                self._after_track_finished(guild.id, err),
-                self.bot.loop,
+        state.playback_started_at = time.monotonic()
+        state.paused_at = None
+        if state.track_finished_at is not None:
+            gap_ms = (time.perf_counter() - state.track_finished_at) * 1000
+            state.track_finished_at = None
+            start_kind = "prefetched" if prefetched else "cold start"
+            self.track_gap_stats[start_kind].add(gap_ms)
+            print(
+                f"Track gap in guild {guild.id}: {gap_ms:.0f} ms ({start_kind}, "
+                f"handoff p95 {self.completion_handoff_stats.percentile(95):.1f} ms)"
             )
-            try:
-                fut.result(timeout=10)
-            except Exception as callback_exc:
-                print(f"after_play callback failed for guild {guild.id}: {callback_exc}")
 
-        try:
-            voice_client.play(source, after=after_play)
-        except Exception as exc:
-            state.now_playing = None
-            await self._send_to_channel(guild, f"Playback failed: `{exc}`")
-            return
+        self._schedule_prefetch(guild, track)
 
         sent = await self._send_now_playing(guild, track)
         if sent:
             state.now_playing_channel_id = sent.channel.id
             state.now_playing_message_id = sent.id
 
+    async def _create_source(self, guild_id: int, track: Track) -> discord.AudioSource:
+        # A track cached on disk needs neither a stream URL nor the API.
+        cached = self.audio_sources.cached_source(track_id_for(track))
+        if cached is not None:
+            return cached
+        # Stream URLs are resolved here rather than at enqueue time, so a track
+        # that waited in a long queue never starts on an expired link.
+        if not await self.stream_urls.ensure(self.bot.http_session, track):
+            raise RuntimeError(f"no stream available for {track.title}")
+        return await self.audio_sources.create(track.stream_url, guild_id=guild_id)
+
+    def _schedule_prefetch(self, guild: discord.Guild, track: Track) -> None:
+        state = self._state(guild.id)
+        self._cancel_prefetch_timer(state)
+        remaining = track.duration - state.playback_elapsed()
+        delay = max(0.0, remaining - PREFETCH_LEAD_SECONDS) if track.duration > 0 else 0.0
+        state.prefetch_task = self.bot.loop.create_task(self._prefetch_next(guild, delay))
+
+    @staticmethod
+    def _cancel_prefetch_timer(state: GuildMusicState) -> None:
+        if state.prefetch_task and not state.prefetch_task.done():
+            state.prefetch_task.cancel()
+
+    def pause_playback(self, guild: discord.Guild) -> bool:
+        """Pause the current track and hold its prefetch until playback resumes."""
+        voice_client = guild.voice_client
+        if not voice_client or not voice_client.is_playing():
+            return False
+        voice_client.pause()
+        state = self._state(guild.id)
+        state.paused_at = time.monotonic()
+        self._cancel_prefetch_timer(state)
+        return True
+
+    def resume_playback(self, guild: discord.Guild) -> bool:
+        """Resume a paused track and reschedule its prefetch from the time left."""
+        voice_client = guild.voice_client
+        if not voice_client or not voice_client.is_paused():
+            return False
+        voice_client.resume()
+        state = self._state(guild.id)
+        if state.paused_at is not None and state.playback_started_at is not None:
+            state.playback_started_at += time.monotonic() - state.paused_at
+        state.paused_at = None
+        if state.now_playing is not None:
+            self._schedule_prefetch(guild, state.now_playing)
+        return True
+
+    def track_gap_summary(self) -> str:
+        """One line with median and p95 track gaps, or an empty string before any were measured."""
+        parts = [
+            f"{kind} p50 {stats.percentile(50):.0f} ms / p95 {stats.percentile(95):.0f} ms (n={stats.count})"
+            for kind, stats in self.track_gap_stats.items()
+            if stats.count
+        ]
+        return " | ".join(parts)
+
+    async def _prefetch_next(self, guild: discord.Guild, delay: float) -> None:
+        """Near the end of the current track, resolve the next stream and pre-spawn its FFmpeg."""
+        await asyncio.sleep(delay)
+        state = self._state(guild.id)
+
+        if state.mode_247 and not state.queue:
+            await self.submit(guild.id, "refill", False)
+        if not state.queue:
+            return
+
+        track = state.queue[0]
+        if state.prefetched_track is track:
+            return
+
+        self._discard_prefetch(state)
+        try:
+            # FFmpeg starts fetching as soon as it is spawned and fills the pipe
+            # buffer, so the switch on `after` does not wait on the CDN.
+            source = await self._create_source(guild.id, track)
+        except Exception as exc:
+            print(f"Prefetch failed in guild {guild.id}: {exc}")
+            return
+        if not state.queue or state.queue[0] is not track:
+            source.cleanup()
+            return
+        state.prefetched_source = source
+        state.prefetched_track = track
+
+    def _take_prefetched_source(self, state: GuildMusicState, track: Track) -> discord.AudioSource | None:
+        if state.prefetched_track is not track:
+            self._discard_prefetch(state)
+            return None
+        source = state.prefetched_source
+        state.prefetched_track = None
+        state.prefetched_source = None
+        return source
+
+    def _discard_prefetch(self, state: GuildMusicState) -> None:
+        if state.prefetched_source is not None:
+            state.prefetched_source.cleanup()
+        state.prefetched_track = None
+        state.prefetched_source = None
+
+    async def submit(self, guild_id: int, kind: str, payload: Any = None) -> Any:
+        """Send a command to the guild's player actor and wait for its result.
+
+        Never call this from inside a command handler; the actor would wait on itself.
+        """
+        future = self.bot.loop.create_future()
+        self._post(guild_id, PlayerCommand(kind, payload, [future]))
+        return await future
+
+    def _post(self, guild_id: int, command: PlayerCommand) -> None:
+        self._ensure_actor(guild_id)
+        self._state(guild_id).mailbox.put_nowait(command)
+
+    def _ensure_actor(self, guild_id: int) -> None:
+        state = self._state(guild_id)
+        if state.worker_task is None or state.worker_task.done():
+            state.worker_task = self.bot.loop.create_task(self._player_loop(guild_id))
+
+    def _track_finished(self, guild_id: int, err: Exception | None) -> None:
+        # A track started before a reload reports to the cog instance that replaced this one.
+        cog = self.bot.get_cog("PlayCog") or self
+        cog._post(guild_id, PlayerCommand("finished", err))
+
+    @staticmethod
+    def _coalesce(batch: list[PlayerCommand]) -> list[PlayerCommand]:
+        merged: list[PlayerCommand] = []
+        for command in batch:
+            previous = merged[-1] if merged else None
+            if (
+                previous is not None
+                and command.kind in COALESCED_COMMANDS
+                and command.kind == previous.kind
+                and command.payload == previous.payload
+            ):
+                previous.waiters.extend(command.waiters)
+                continue
+            merged.append(command)
+        return merged
+
+    async def _player_loop(self, guild_id: int) -> None:
+        """The guild's player actor: the only place its queue and playback change.
+
+        Commands are taken from the mailbox in bursts and run one at a time,
+        with back-to-back duplicates folded into a single run.
+        """
+        state = self._state(guild_id)
+        while True:
+            batch = [await state.mailbox.get()]
+            while not state.mailbox.empty():
+                batch.append(state.mailbox.get_nowait())
+
+            commands_left = self._coalesce(batch)
+            while commands_left:
+                command = commands_left.pop(0)
+                if command.waiters and all(waiter.cancelled() for waiter in command.waiters):
+                    # Nobody is waiting any more, e.g. a bulk enqueue cancelled by stop.
+                    continue
+                result: Any = None
+                error: Exception | None = None
+                try:
+                    result = await self._handle_command(guild_id, state, command)
+                except asyncio.CancelledError:
+                    # The cog is unloading: fail the interrupted command and hand the
+                    # rest back to the mailbox, ahead of anything posted since.
+                    for waiter in command.waiters:
+                        waiter.cancel()
+                    while not state.mailbox.empty():
+                        commands_left.append(state.mailbox.get_nowait())
+                    for pending in commands_left:
+                        state.mailbox.put_nowait(pending)
+                    successor = self.bot.get_cog("PlayCog")
+                    if successor is not None and successor is not self and not state.mailbox.empty():
+                        successor._ensure_actor(guild_id)
+                    raise
+                except Exception as exc:
+                    print(f"Player command '{command.kind}' failed in guild {guild_id}: {exc}")
+                    error = exc
+                for waiter in command.waiters:
+                    if waiter.done():
+                        continue
+                    if error is not None:
+                        waiter.set_exception(error)
+                    else:
+                        waiter.set_result(result)
+
+    async def _handle_command(self, guild_id: int, state: GuildMusicState, command: PlayerCommand) -> Any:
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return None
+
+        kind = command.kind
+        if kind == "finished":
+            if state.track_finished_at is not None:
+                self.completion_handoff_stats.add((time.perf_counter() - state.track_finished_at) * 1000)
+            await self._after_track_finished(guild_id, command.payload)
+            return None
+        if kind == "enqueue":
+            return await self._handle_enqueue(guild, state, command.payload)
+        if kind == "skip":
+            voice_client = guild.voice_client
+            if not voice_client or not (voice_client.is_playing() or voice_client.is_paused()):
+                return False
+            # The finished track comes back through the mailbox as "finished".
+            voice_client.stop()
+            return True
+        if kind == "clear":
+            self._cancel_bulk_enqueues(state)
+            count = len(state.queue)
+            state.queue.clear()
+            self._discard_prefetch(state)
+            return count
+        if kind == "stop":
+            return await self._handle_stop(guild, state)
+        if kind == "refill":
+            await self._play_most_popular_for_guild(guild, start_playback=bool(command.payload))
+            if command.payload:
+                await self._start_next_track(guild)
+            return None
+        if kind == "sort":
+            if len(state.queue) >= 2:
+                state.sort_queue_by_play_count()
+            return len(state.queue)
+        if kind == "disable_247":
+            state.mode_247 = False
+            state.voice_channel_id = None
+            voice_client = guild.voice_client
+            if voice_client and voice_client.is_connected():
+                await voice_client.disconnect()
+            return None
+        raise ValueError(f"unknown player command {kind!r}")
+
+    async def _handle_enqueue(self, guild: discord.Guild, state: GuildMusicState, tracks: list[Track]) -> tuple[int, bool]:
+        """Queue tracks and start playback if idle.
+
+        Returns the first track's queue position and whether playback was started.
+        """
+        state.queue.extend(tracks)
+        position = len(state.queue) - len(tracks) + 1
+        voice_client = guild.voice_client
+        if voice_client and (voice_client.is_playing() or voice_client.is_paused() or state.now_playing):
+            return position, False
+        await self._start_next_track(guild)
+        return position, True
+
+    async def _handle_stop(self, guild: discord.Guild, state: GuildMusicState) -> bool:
+        """Clear the queue and stop, disconnecting unless 24/7 mode is on.
+
+        Returns True when 24/7 mode kept the bot connected and refilled the queue.
+        """
+        self._cancel_bulk_enqueues(state)
+        state.queue.clear()
+        state.now_playing = None
+        self._discard_prefetch(state)
+
+        voice_client = guild.voice_client
+        if not voice_client or not voice_client.is_connected():
+            return False
+        if voice_client.is_playing() or voice_client.is_paused():
+            voice_client.stop()
+        if state.mode_247:
+            await self._play_most_popular_for_guild(guild, start_playback=False)
+            return True
+        await voice_client.disconnect()
+        return False
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> asyncio.Task:
+        task = self.bot.loop.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    @staticmethod
+    def _cancel_bulk_enqueues(state: GuildMusicState) -> None:
+        for task in list(state.bulk_enqueue_tasks):
+            task.cancel()
+        state.bulk_enqueue_tasks.clear()
+
+    async def _iter_request_tracks(self, items: list[str]) -> AsyncGenerator[Track, None]:
+        """Yield tracks for /play input in order: one link, or several queries and links."""
+        session = self.bot.http_session
+        if len(items) == 1:
+            async for track in self.jiosaavn.iter_link_tracks(session, items[0], BULK_ENQUEUE_MAX_TRACKS):
+                yield track
+            return
+
+        async def resolve(item: str) -> list[Track]:
+            if link_kind(item):
+                return [track async for track in self.jiosaavn.iter_link_tracks(session, item, BULK_ENQUEUE_MAX_TRACKS)]
+            track = await self.jiosaavn.search_first_track(session, item)
+            return [track] if track else []
+
+        factories = [lambda item=item: resolve(item) for item in items[:BULK_ENQUEUE_MAX_QUERIES]]
+        yielded = 0
+        async for tracks in ordered_fanout(factories, REFILL_CONCURRENCY, BULK_RESOLVE_TIMEOUT_SECONDS):
+            for track in tracks or []:
+                if yielded >= BULK_ENQUEUE_MAX_TRACKS:
+                    return
+                yielded += 1
+                yield track
+
+    async def _enqueue_rest(self, guild_id: int, tracks: AsyncGenerator[Track, None], requester_id: int) -> None:
+        """Hand the remaining tracks of a bulk /play to the player as they resolve."""
+        added = 0
+        batch: list[Track] = []
+        last_flush = time.monotonic()
+        try:
+            try:
+                async for track in tracks:
+                    track.requester_id = requester_id
+                    batch.append(track)
+                    if len(batch) >= ENQUEUE_BATCH_SIZE or time.monotonic() - last_flush >= ENQUEUE_FLUSH_SECONDS:
+                        await self.submit(guild_id, "enqueue", batch)
+                        added += len(batch)
+                        batch = []
+                        last_flush = time.monotonic()
+            except UpstreamUnavailable as exc:
+                print(f"Bulk enqueue in guild {guild_id} stopped early: {exc}")
+            if batch:
+                await self.submit(guild_id, "enqueue", batch)
+                added += len(batch)
+        finally:
+            await tracks.aclose()
+
+        guild = self.bot.get_guild(guild_id)
+        if guild and added:
+            await self._send_to_channel(guild, f"Added {added} more track(s) to the queue.")
+
     async def _after_track_finished(self, guild_id: int, err: Exception | None) -> None:
         guild = self.bot.get_guild(guild_id)
         if not guild:
@@ -231,54 +618,94 @@ class PlayCog(commands.Cog):
 
         state = self._state(guild_id)
         finished_track = state.now_playing
+        finished_message = (state.now_playing_channel_id, state.now_playing_message_id)
+        state.now_playing = None
+        state.now_playing_channel_id = None
+        state.now_playing_message_id = None
+
+        # Start the next track before any bookkeeping so it does not delay the switch.
+        # Handle 24/7 mode - auto-play most popular if queue is empty
+        if state.mode_247 and not state.queue:
+            await self._play_most_popular_for_guild(guild)
 
+        await self._start_next_track(guild)
+
+        # Bookkeeping runs on its own so a slow delete never holds up the next completion.
+        self._spawn(self._record_finished_track(state, finished_track, finished_message))
+
+    async def _record_finished_track(
+        self,
+        state: GuildMusicState,
+        finished_track: Track | None,
+        finished_message: tuple[int | None, int | None],
+    ) -> None:
         # Record play count for finished track
         if finished_track:
             play_count = state.record_play(finished_track)
             print(f"Track '{finished_track.title}' played {play_count} times")
-
-        await delete_message_by_id(self.bot, state.now_playing_channel_id, state.now_playing_message_id)
+            self.search_index.add_track(finished_track, play_count)
+            disk_cache = self.audio_sources.disk_cache
+            if disk_cache is not None:
+                track_id = track_id_for(finished_track)
+                disk_cache.record_play(track_id)
+                disk_cache.maybe_populate(track_id, finished_track.stream_url, play_count)
+
+        await delete_message_by_id(self.bot, *finished_message)
         if finished_track:
             await delete_message_by_id(
                 self.bot,
                 finished_track.request_channel_id,
                 finished_track.request_message_id,
             )
-        state.now_playing = None
-        state.now_playing_channel_id = None
-        state.now_playing_message_id = None
-
-        # Handle 24/7 mode - auto-play most popular if queue is empty
-        if state.mode_247 and not state.queue:
-            await self._play_most_popular_for_guild(guild)
 
-        await self._start_next_track(guild)
+    async def _play_most_popular_for_guild(self, guild: discord.Guild, start_playback: bool = True) -> None:
+        """Fetch and queue most popular songs for 24/7 mode.
 
-    async def _play_most_popular_for_guild(self, guild: discord.Guild) -> None:
-        """Fetch and queue most popular songs for 24/7 mode."""
+        Candidates resolve concurrently but are queued in ranking order, and
+        playback starts as soon as the first one is ready.
+        """
         state = self._state(guild.id)
+        session = self.bot.http_session
 
         # Get popular track IDs
         popular_ids = state.get_most_played_tracks(limit=10)
 
+        resolvers: list[Callable[[], Awaitable[Track | None]]] = []
         if not popular_ids:
             # No history yet, search for popular Hindi songs
             popular_queries = ["Bollywood Hits", "Arijit Singh", "Neha Kakkar", "Badshah", "Honey Singh"]
-            import random
             query = random.choice(popular_queries)
-            track = await self.jiosaavn.search_first_track(self.bot.http_session, query)
-            if track:
-                state.queue.append(track)
-            return
-
-        # Fetch tracks by their IDs (search by title/URL fragment)
-        for track_id in popular_ids[:5]:  # Top 5
-            # Search for the track
-            track = await self.jiosaavn.search_first_track(self.bot.http_session, track_id)
-            if track:
-                state.queue.append(track)
-
-    @commands.hybrid_command(name="play", description="Play a song from JioSaavn")
+            resolvers.append(lambda: self.jiosaavn.search_first_track(session, query))
+        else:
+            # Rehydrate stored tracks locally; their stream URLs are resolved just before
+            # they play, and only tracks without stored metadata fall back to a search
+            top_ids = popular_ids[:5]  # Top 5
+            stored = state.play_count_manager.get_tracks(top_ids)
+
+            async def resolve(track_id: str) -> Track | None:
+                track = stored.get(track_id)
+                if track is None:
+                    return await self.jiosaavn.search_first_track(session, track_id)
+                return track
+
+            resolvers.extend(lambda track_id=track_id: resolve(track_id) for track_id in top_ids)
+
+        async for track in ordered_fanout(resolvers, REFILL_CONCURRENCY, REFILL_TIMEOUT_SECONDS):
+            if not track:
+                continue
+            state.queue.append(track)
+            voice_client = guild.voice_client
+            if (
+                start_playback
+                and voice_client
+                and voice_client.is_connected()
+                and not voice_client.is_playing()
+                and not voice_client.is_paused()
+                and not state.now_playing
+            ):
+                await self._start_next_track(guild)
+
+    @commands.hybrid_command(name="play", description="Play a song, playlist, album or artist from JioSaavn")
     async def play(self, ctx: commands.Context, *, query: str) -> None:
         if not ctx.guild:
             await reply_and_cleanup(ctx, "Use this command in a server.")
@@ -298,25 +725,48 @@ class PlayCog(commands.Cog):
             await reply_and_cleanup(ctx, "HTTP session is not ready.")
             return
 
-        track = await self.jiosaavn.search_first_track(self.bot.http_session, query)
+        items = split_play_input(query)
+        tracks: AsyncGenerator[Track, None] | None = None
+        try:
+            if len(items) > 1 or (items and link_kind(items[0])):
+                # Playlists, albums, artists and multi-query input: queue the first
+                # track now and let the rest follow in the background.
+                tracks = self._iter_request_tracks(items)
+                track = await anext(tracks, None)
+            else:
+                track = await self.jiosaavn.search_first_track(self.bot.http_session, query)
+        except UpstreamUnavailable:
+            if tracks is not None:
+                await tracks.aclose()
+            await reply_and_cleanup(ctx, "JioSaavn is not responding right now. Try again in a moment.")
+            return
         if not track:
+            if tracks is not None:
+                await tracks.aclose()
             await reply_and_cleanup(ctx, "No result found for that query.")
             return
 
         state = self._state(ctx.guild.id)
         state.text_channel_id = ctx.channel.id
+        track.requester_id = ctx.author.id
         if ctx.message is not None:
             track.request_channel_id = ctx.channel.id
             track.request_message_id = ctx.message.id
-        state.queue.append(track)
-
-        if voice_client.is_playing() or voice_client.is_paused() or state.now_playing:
-            await reply_and_cleanup(
-                ctx, f"Queued: **{track.title}** - {track.artist} (position {len(state.queue)})"
-            )
-            return
 
-        await self._start_next_track(ctx.guild)
+        position, started = await self.submit(ctx.guild.id, "enqueue", [track])
+        if tracks is not None:
+            task = self._spawn(self._enqueue_rest(ctx.guild.id, tracks, ctx.author.id))
+            state.bulk_enqueue_tasks.add(task)
+            task.add_done_callback(state.bulk_enqueue_tasks.discard)
+        if not started:
+            await reply_and_cleanup(ctx, f"Queued: **{track.title}** - {track.artist} (position {position})")
+
+    @play.autocomplete("query")
+    async def play_query_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        # Answered from the local index only; a live search per keystroke would flood the API.
+        return [app_commands.Choice(name=label, value=value) for label, value in self.search_index.suggest(current)]
 
     @commands.hybrid_command(name="sortqueue", description="Sort queue by play count (most played first)")
     async def sort_queue(self, ctx: commands.Context) -> None:
@@ -324,32 +774,33 @@ class PlayCog(commands.Cog):
             await reply_and_cleanup(ctx, "Use this command in a server.")
             return
 
-        state = self._state(ctx.guild.id)
-        if not state.queue:
+        await ctx.defer()
+        count = await self.submit(ctx.guild.id, "sort")
+        if not count:
             await reply_and_cleanup(ctx, "Queue is empty.")
             return
 
-        if len(state.queue) < 2:
+        if count < 2:
             await reply_and_cleanup(ctx, "Need at least 2 songs to sort.")
             return
 
-        state.sort_queue_by_play_count()
-        await reply_and_cleanup(ctx, f"Queue sorted by play count! {len(state.queue)} songs reordered.")
+        await reply_and_cleanup(ctx, f"Queue sorted by play count! {count} songs reordered.")
 
     @commands.hybrid_command(name="popular", description="Show most played songs")
-    async def popular(self, ctx: commands.Context, limit: int = 10) -> None:
+    async def popular(self, ctx: commands.Context, limit: int = 10, scope: str = "server") -> None:
         if not ctx.guild:
             await reply_and_cleanup(ctx, "Use this command in a server.")
             return
 
+        global_scope = scope.strip().lower() in {"global", "all"}
         state = self._state(ctx.guild.id)
-        top_tracks = state.play_count_manager.get_all_sorted(min(limit, 20))
+        top_tracks = state.get_most_played(min(limit, 20), global_scope=global_scope)
 
         if not top_tracks:
             await reply_and_cleanup(ctx, "No play history yet! Play some songs first.")
             return
 
-        lines = ["**Most Played Songs:**"]
+        lines = ["**Most Played Songs (all servers):**" if global_scope else "**Most Played Songs:**"]
         for i, (track_id, count) in enumerate(top_tracks, 1):
             lines.append(f"{i}. `{track_id}` - {count} plays")
 
@@ -365,7 +816,11 @@ class PlayCog(commands.Cog):
 
         if state.now_playing:
             count = state.get_play_count(state.now_playing)
-            await reply_and_cleanup(ctx, f"**{state.now_playing.title}** has been played **{count}** times.")
+            total = state.get_play_count(state.now_playing, global_scope=True)
+            await reply_and_cleanup(
+                ctx,
+                f"**{state.now_playing.title}** has been played **{count}** times here ({total} overall).",
+            )
             return
 
         if state.queue:
@@ -1,8 +1,84 @@
 from __future__ import annotations
 
+import discord
 from discord.ext import commands
 
-from core.cleanup import reply_and_cleanup
+from core.cleanup import make_embed, reply_and_cleanup, schedule_command_cleanup
+from core.music_state import GuildMusicState
+
+
+def _queue_text(state: GuildMusicState, page: int) -> str:
+    lines: list[str] = []
+    if state.now_playing:
+        lines.append(f"Now: **{state.now_playing.title}** - {state.now_playing.artist}")
+
+    if not state.queue:
+        lines.append("Up next: empty")
+        return "\n".join(lines)
+
+    pages = state.queue_pages
+    page = max(0, min(page, pages.page_count - 1))
+    lines.append(f"Up next ({len(state.queue)} tracks, page {page + 1}/{pages.page_count}):")
+    lines.append(pages.render(page))
+    return "\n".join(lines)
+
+
+class JumpToPageModal(discord.ui.Modal, title="Jump to page"):
+    page = discord.ui.TextInput(label="Page number", max_length=6)
+
+    def __init__(self, view: "QueueView"):
+        super().__init__()
+        self.view = view
+
+    async def on_submit(self, interaction: discord.Interaction) -> None:
+        text = str(self.page.value).strip()
+        if not text.isdigit():
+            await interaction.response.send_message("Enter a page number.", ephemeral=True)
+            return
+        await self.view.show(interaction, int(text) - 1)
+
+
+class QueueView(discord.ui.View):
+    def __init__(self, bot: commands.Bot, state: GuildMusicState, page: int = 0):
+        super().__init__(timeout=120)
+        self.bot = bot
+        self.state = state
+        self.page = page
+        self.message: discord.Message | None = None
+
+    def embed(self) -> discord.Embed:
+        self.page = max(0, min(self.page, self.state.queue_pages.page_count - 1))
+        return make_embed(_queue_text(self.state, self.page))
+
+    async def show(self, interaction: discord.Interaction, page: int) -> None:
+        self.page = page
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    async def on_timeout(self) -> None:
+        # The view message outlives AUTO_DELETE_SECONDS so paging keeps working; it goes when the buttons stop.
+        if self.message is None:
+            return
+        try:
+            if getattr(self.bot, "auto_delete_enabled", False):
+                await self.message.delete()
+            else:
+                for item in self.children:
+                    item.disabled = True
+                await self.message.edit(view=self)
+        except discord.HTTPException:
+            pass
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
+        await self.show(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
+        await self.show(interaction, self.page + 1)
+
+    @discord.ui.button(label="Jump", style=discord.ButtonStyle.primary)
+    async def jump(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
+        await interaction.response.send_modal(JumpToPageModal(self))
 
 
 class QueueCog(commands.Cog):
@@ -10,37 +86,24 @@ class QueueCog(commands.Cog):
         self.bot = bot
 
     @commands.hybrid_command(name="queue", description="Show queue")
-    async def queue(self, ctx: commands.Context) -> None:
+    async def queue(self, ctx: commands.Context, page: int = 1) -> None:
         if not ctx.guild or not hasattr(self.bot, "music_states"):
             await reply_and_cleanup(ctx, "Queue is empty.")
             return
 
         state = self.bot.music_states.get(ctx.guild.id)
-        if not state:
+        if not state or (not state.now_playing and not state.queue):
             await reply_and_cleanup(ctx, "Queue is empty.")
             return
 
-        lines: list[str] = []
-        if state.now_playing:
-            lines.append(f"Now: **{state.now_playing.title}** - {state.now_playing.artist}")
-
-        if not state.queue:
-            if lines:
-                lines.append("Up next: empty")
-                await reply_and_cleanup(ctx, "\n".join(lines))
-                return
-            await reply_and_cleanup(ctx, "Queue is empty.")
+        if state.queue_pages.page_count <= 1:
+            await reply_and_cleanup(ctx, _queue_text(state, 0))
             return
 
-        lines.append("Up next:")
-        for i, track in enumerate(list(state.queue)[:10], start=1):
-            lines.append(f"{i}. {track.title} - {track.artist}")
-
-        remaining = len(state.queue) - 10
-        if remaining > 0:
-            lines.append(f"...and {remaining} more")
-
-        await reply_and_cleanup(ctx, "\n".join(lines))
+        view = QueueView(self.bot, state, page - 1)
+        view.message = await ctx.reply(embed=view.embed(), view=view)
+        # Only the invoking message is cleaned up on the usual timer; the view deletes itself on timeout.
+        schedule_command_cleanup(ctx, None)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -20,11 +20,15 @@ class ResumeCog(commands.Cog):
             await reply_and_cleanup(ctx, "I am not in a voice channel.")
             return
 
-        if not voice_client.is_paused():
+        play_cog = self.bot.get_cog("PlayCog")
+        if play_cog is None:
+            await reply_and_cleanup(ctx, "The music player is not loaded.")
+            return
+
+        if not play_cog.resume_playback(ctx.guild):
             await reply_and_cleanup(ctx, "Nothing is paused.")
             return
 
-        voice_client.resume()
         await reply_and_cleanup(ctx, "Resumed.")
 
 
@@ -20,11 +20,17 @@ class SkipCog(commands.Cog):
             await reply_and_cleanup(ctx, "I am not in a voice channel.")
             return
 
-        if not voice_client.is_playing() and not voice_client.is_paused():
+        play_cog = self.bot.get_cog("PlayCog")
+        if play_cog is None:
+            await reply_and_cleanup(ctx, "The music player is not loaded.")
+            return
+
+        # The player may be busy starting a track, longer than Discord waits for a response.
+        await ctx.defer()
+        if not await play_cog.submit(ctx.guild.id, "skip"):
             await reply_and_cleanup(ctx, "Nothing is playing.")
             return
 
-        voice_client.stop()
         await reply_and_cleanup(ctx, "Skipped.")
 
 
@@ -15,29 +15,18 @@ class StopCog(commands.Cog):
             await reply_and_cleanup(ctx, "Use this command in a server.")
             return
 
-        state = None
-        if hasattr(self.bot, "music_states") and ctx.guild.id in self.bot.music_states:
-            state = self.bot.music_states[ctx.guild.id]
-            state.queue.clear()
-            state.now_playing = None
-            if state.worker_task and not state.worker_task.done():
-                state.worker_task.cancel()
-            state.worker_task = None
-
-        voice_client = ctx.guild.voice_client
-        if voice_client and voice_client.is_connected():
-            if voice_client.is_playing() or voice_client.is_paused():
-                voice_client.stop()
-            if state and state.mode_247:
-                play_cog = self.bot.get_cog("PlayCog")
-                if play_cog:
-                    await play_cog._play_most_popular_for_guild(ctx.guild)
-                await reply_and_cleanup(
-                    ctx,
-                    "Stopped current playback. 24/7 is enabled, so I stayed connected.",
-                )
-                return
-            await voice_client.disconnect()
+        play_cog = self.bot.get_cog("PlayCog")
+        if play_cog is None:
+            await reply_and_cleanup(ctx, "The music player is not loaded.")
+            return
+
+        await ctx.defer()
+        if await play_cog.submit(ctx.guild.id, "stop"):
+            await reply_and_cleanup(
+                ctx,
+                "Stopped current playback. 24/7 is enabled, so I stayed connected.",
+            )
+            return
 
         await reply_and_cleanup(ctx, "Stopped playback and cleared queue.")
 
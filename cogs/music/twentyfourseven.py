@@ -22,7 +22,7 @@ class TwentyFourSevenCog(commands.Cog):
 
     def _state(self, guild_id: int) -> GuildMusicState:
         if guild_id not in self.bot.music_states:
-            self.bot.music_states[guild_id] = GuildMusicState()
+            self.bot.music_states[guild_id] = GuildMusicState(guild_id)
         return self.bot.music_states[guild_id]
 
     @commands.hybrid_command(name="247", description="Toggle 24/7 mode - bot stays in voice and auto-plays popular songs")
@@ -40,12 +40,15 @@ class TwentyFourSevenCog(commands.Cog):
 
         if guild_id in self._247_guilds:
             # Disable 24/7 mode
+            from cogs.music.play import PlayCog
+
+            play_cog = self.bot.get_cog("PlayCog")
+            if not isinstance(play_cog, PlayCog):
+                await reply_and_cleanup(ctx, "The music player is not loaded.")
+                return
             self._247_guilds.discard(guild_id)
-            state = self._state(guild_id)
-            state.mode_247 = False
-            state.voice_channel_id = None
-            if voice_client and voice_client.is_connected():
-                await voice_client.disconnect()
+            await ctx.defer()
+            await play_cog.submit(guild_id, "disable_247")
             await reply_and_cleanup(ctx, "24/7 mode disabled. Bot will leave when queue is empty.")
             return
 
@@ -70,7 +73,6 @@ class TwentyFourSevenCog(commands.Cog):
     async def _play_most_popular(self, guild: discord.Guild) -> None:
         """Play the most popular song based on play count."""
         from cogs.music.play import PlayCog
-        from core.jiosaavn import JioSaavnClient
 
         play_cog = self.bot.get_cog("PlayCog")
         if not isinstance(play_cog, PlayCog):
@@ -80,20 +82,12 @@ class TwentyFourSevenCog(commands.Cog):
         if not state.mode_247:
             return
 
-        # Get most popular tracks from play history
-        popular_tracks = state.get_most_played_tracks(limit=10)
-
         voice_client = guild.voice_client
         if not voice_client or not voice_client.is_connected():
             return
 
-        # Add popular tracks to queue
-        for track in popular_tracks:
-            state.queue.append(track)
-
-        # Start playing if not already
-        if not voice_client.is_playing() and not voice_client.is_paused() and not state.now_playing:
-            await play_cog._start_next_track(guild)
+        # Queue most popular tracks; playback starts as soon as the first one resolves
+        await play_cog.submit(guild.id, "refill", True)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState) -> None:
@@ -12,7 +12,16 @@ class PingCog(commands.Cog):
     @commands.hybrid_command(name="ping", description="Show bot latency")
     async def ping(self, ctx: commands.Context) -> None:
         latency_ms = round(self.bot.latency * 1000)
-        await reply_and_cleanup(ctx, f"Pong! `{latency_ms}ms`")
+        mirrors = self.bot.jiosaavn.mirrors
+        lines = [
+            f"Pong! `{latency_ms}ms`",
+            f"JioSaavn API: `{mirrors.healthy_count}/{len(mirrors.mirrors)}` mirrors healthy",
+        ]
+        play_cog = self.bot.get_cog("PlayCog")
+        gaps = play_cog.track_gap_summary() if play_cog is not None else ""
+        if gaps:
+            lines.append(f"Gap between tracks: `{gaps}`")
+        await reply_and_cleanup(ctx, "\n".join(lines))
 
 
 async def setup(bot: commands.Bot) -> None:
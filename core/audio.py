@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import shlex
+from typing import Any
+from urllib.parse import urlsplit
+
+import discord
+
+from core.audio_cache import AudioDiskCache
+from core.audio_workers import AudioWorkerPool
+from core.cache import TTLCache
+from core.concurrency import SingleFlight
+from core.shared_audio import SharedAudioRegistry
+
+FFMPEG_BEFORE_OPTIONS = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5"
+OPUS_CODECS = {"opus", "libopus"}
+
+
+class AudioSourceFactory:
+    """Builds FFmpeg Opus sources with the cheapest path each stream allows.
+
+    Streams that already carry Opus are copied without re-encoding; anything
+    else is transcoded once with the configured bitrate, compression level and
+    thread count. Probe results are cached per host and file extension, since
+    a CDN serves every track of a given format the same way.
+    """
+
+    def __init__(
+        self,
+        bitrate: int = 128,
+        threads: int = 0,
+        compression_level: int = 2,
+        probe: bool = True,
+        probe_cache_ttl: float = 24 * 3600,
+        shared: SharedAudioRegistry | None = None,
+        disk_cache: AudioDiskCache | None = None,
+        workers: AudioWorkerPool | None = None,
+    ) -> None:
+        self.bitrate = bitrate
+        self.threads = threads
+        self.compression_level = compression_level
+        self.probe_enabled = probe
+        self.shared = shared
+        self.disk_cache = disk_cache
+        self.workers = workers
+        self.probe_cache: TTLCache[str] = TTLCache(256, probe_cache_ttl)
+        self._probe_flights: SingleFlight[str] = SingleFlight()
+
+    @staticmethod
+    def probe_key(url: str) -> tuple[str, str]:
+        parts = urlsplit(url)
+        return parts.netloc.lower(), os.path.splitext(parts.path)[1].lower()
+
+    async def codec_for(self, url: str) -> str | None:
+        """Return the source codec for url, probing at most once per host/format."""
+        if not self.probe_enabled:
+            return None
+
+        key = self.probe_key(url)
+        codec = self.probe_cache.get(key)
+        if codec is not None:
+            return codec or None
+        return await self._probe_flights.do(key, lambda: self._probe(key, url)) or None
+
+    async def _probe(self, key: tuple[str, str], url: str) -> str:
+        try:
+            codec, _ = await discord.FFmpegOpusAudio.probe(url)
+        except Exception as exc:
+            print(f"ffprobe failed for {key[0]}: {exc}")
+            # Cache "unknown" briefly so a failing probe is not retried for every track.
+            self.probe_cache.set(key, "", 300)
+            return ""
+        codec = codec or ""
+        self.probe_cache.set(key, codec)
+        return codec
+
+    def ffmpeg_options(self, codec: str | None) -> str:
+        options = ["-vn"]
+        if codec not in OPUS_CODECS:
+            options.extend(["-compression_level", str(self.compression_level)])
+        if self.threads > 0:
+            options.extend(["-threads", str(self.threads)])
+        return " ".join(options)
+
+    def ffmpeg_argv(self, url: str, codec: str | None) -> list[str]:
+        """The FFmpeg command FFmpegOpusAudio would run, for use in audio workers."""
+        return [
+            "ffmpeg",
+            *shlex.split(FFMPEG_BEFORE_OPTIONS),
+            "-i",
+            url,
+            "-map_metadata",
+            "-1",
+            "-f",
+            "opus",
+            "-c:a",
+            "copy" if codec in OPUS_CODECS else "libopus",
+            "-ar",
+            "48000",
+            "-ac",
+            "2",
+            "-b:a",
+            f"{self.bitrate}k",
+            "-loglevel",
+            "warning",
+            *shlex.split(self.ffmpeg_options(codec)),
+            "pipe:1",
+        ]
+
+    def cached_source(self, cache_key: str) -> discord.AudioSource | None:
+        """A source for the track's file in the disk cache, or None if it is not cached."""
+        if self.disk_cache is None:
+            return None
+        path = self.disk_cache.lookup(cache_key)
+        if not path:
+            return None
+        # Cached files are already Ogg Opus, so FFmpeg only remuxes them.
+        return discord.FFmpegOpusAudio(path, codec="opus", options="-vn")
+
+    async def create(
+        self,
+        url: str,
+        cache_key: str | None = None,
+        guild_id: int | None = None,
+    ) -> discord.AudioSource:
+        if cache_key:
+            cached = self.cached_source(cache_key)
+            if cached is not None:
+                return cached
+
+        codec = await self.codec_for(url)
+
+        def spawn() -> discord.AudioSource:
+            if self.workers is not None:
+                return self.workers.open_stream(self.ffmpeg_argv(url, codec), guild_id)
+            return discord.FFmpegOpusAudio(
+                url,
+                bitrate=self.bitrate,
+                codec=codec,
+                before_options=FFMPEG_BEFORE_OPTIONS,
+                options=self.ffmpeg_options(codec),
+            )
+
+        if self.shared is not None:
+            return self.shared.acquire(url, spawn)
+        return spawn()
+
+    def close(self) -> None:
+        if self.shared is not None:
+            self.shared.close()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+        if self.workers is not None:
+            self.workers.close()
+
+    def stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = {
+            "probe_cache": self.probe_cache.stats(),
+            "bitrate": self.bitrate,
+            "threads": self.threads,
+        }
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        if self.disk_cache is not None:
+            stats["disk_cache"] = self.disk_cache.stats()
+        if self.workers is not None:
+            stats["workers"] = self.workers.stats()
+        return stats
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any
+
+OGG_MAGIC = b"OggS"
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AudioDiskCache:
+    """Size-bounded on-disk cache of pre-encoded Ogg Opus files for popular tracks.
+
+    Tracks are encoded in the background once they reach min_plays. Entries
+    are checked for size and Ogg header on every lookup and against their
+    SHA-256 once at startup; anything that fails is dropped. The least
+    recently played entries are evicted when the cache grows past max_bytes.
+    """
+
+    def __init__(
+        self,
+        directory: str = "data/audio_cache",
+        max_bytes: int = 2 * 1024**3,
+        min_plays: int = 5,
+        bitrate: int = 128,
+        ffmpeg: str = "ffmpeg",
+        max_concurrent_encodes: int = 1,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_plays = min_plays
+        self.bitrate = bitrate
+        self.ffmpeg = ffmpeg
+        self.hits = 0
+        self.misses = 0
+        self._index_path = os.path.join(directory, "index.json")
+        self._index: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._encoding: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        # Running encoders by temp file path, so close() can stop them.
+        self._encoders: dict[str, asyncio.subprocess.Process] = {}
+        self._encode_slots = asyncio.Semaphore(max(1, max_concurrent_encodes))
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+        threading.Thread(target=self._verify_all, name="audio-cache-verify", daemon=True).start()
+
+    def _load_index(self) -> None:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            self._index = {}
+
+        known = {entry["file"] for entry in self._index.values()}
+        for name in os.listdir(self.directory):
+            # Leftover temp files and files the index lost track of.
+            if name != "index.json" and name not in known:
+                self._remove_file(name)
+
+    def _save_index(self) -> None:
+        with self._lock:
+            snapshot = json.dumps(self._index, separators=(",", ":"))
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self._index_path)
+
+    def _remove_file(self, name: str) -> None:
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def _drop(self, track_id: str) -> None:
+        with self._lock:
+            entry = self._index.pop(track_id, None)
+        if entry:
+            self._remove_file(entry["file"])
+
+    def _verify_all(self) -> None:
+        with self._lock:
+            entries = list(self._index.items())
+        dropped = False
+        for track_id, entry in entries:
+            path = os.path.join(self.directory, entry["file"])
+            try:
+                ok = _sha256_file(path) == entry.get("sha256")
+            except OSError:
+                ok = False
+            if not ok:
+                print(f"Audio cache entry for {track_id} failed verification; dropping it")
+                self._drop(track_id)
+                dropped = True
+        if dropped:
+            self._save_index()
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry["size"] for entry in self._index.values())
+
+    def lookup(self, track_id: str) -> str | None:
+        """Return the cached file for track_id if it is present and intact."""
+        with self._lock:
+            entry = self._index.get(track_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        path = os.path.join(self.directory, entry["file"])
+        try:
+            with open(path, "rb") as f:
+                intact = f.read(len(OGG_MAGIC)) == OGG_MAGIC and os.fstat(f.fileno()).st_size == entry["size"]
+        except OSError:
+            intact = False
+        if not intact:
+            self._drop(track_id)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return path
+
+    def record_play(self, track_id: str) -> None:
+        """Count a play of a cached track; lookups alone do not, since prefetch also looks up."""
+        with self._lock:
+            entry = self._index.get(track_id)
+            if entry is not None:
+                entry["last_used"] = time.time()
+                entry["plays"] = entry.get("plays", 0) + 1
+
+    def maybe_populate(self, track_id: str, stream_url: str, play_count: int) -> None:
+        """Encode the track in the background once it is popular enough to keep locally."""
+        if play_count < self.min_plays or not stream_url or track_id in self._encoding:
+            return
+        with self._lock:
+            if track_id in self._index:
+                return
+        self._encoding.add(track_id)
+        task = asyncio.get_running_loop().create_task(self._populate(track_id, stream_url))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _populate(self, track_id: str, stream_url: str) -> None:
+        name = hashlib.sha1(track_id.encode("utf-8")).hexdigest() + ".opus"
+        final_path = os.path.join(self.directory, name)
+        tmp_path = f"{final_path}.part"
+        try:
+            async with self._encode_slots:
+                proc = await asyncio.create_subprocess_exec(
+                    self.ffmpeg,
+                    "-nostdin",
+                    "-loglevel",
+                    "error",
+                    "-y",
+                    "-i",
+                    stream_url,
+                    "-vn",
+                    "-map_metadata",
+                    "-1",
+                    "-c:a",
+                    "libopus",
+                    "-b:a",
+                    f"{self.bitrate}k",
+                    "-ar",
+                    "48000",
+                    "-ac",
+                    "2",
+                    "-f",
+                    "ogg",
+                    tmp_path,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                self._encoders[tmp_path] = proc
+                try:
+                    _, stderr = await proc.communicate()
+                finally:
+                    self._encoders.pop(tmp_path, None)
+            if proc.returncode != 0:
+                print(f"Audio cache encode failed for {track_id}: {stderr.decode(errors='replace').strip()}")
+                self._remove_file(os.path.basename(tmp_path))
+                return
+
+            size = os.path.getsize(tmp_path)
+            digest = await asyncio.to_thread(_sha256_file, tmp_path)
+            os.replace(tmp_path, final_path)
+            now = time.time()
+            with self._lock:
+                self._index[track_id] = {
+                    "file": name,
+                    "size": size,
+                    "sha256": digest,
+                    "created": now,
+                    "last_used": now,
+                    "plays": 0,
+                }
+            self._evict()
+            await asyncio.to_thread(self._save_index)
+        except (OSError, asyncio.CancelledError) as exc:
+            self._remove_file(os.path.basename(tmp_path))
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            print(f"Audio cache encode failed for {track_id}: {exc}")
+        finally:
+            self._encoding.discard(track_id)
+
+    def _evict(self) -> None:
+        with self._lock:
+            total = sum(entry["size"] for entry in self._index.values())
+            if total <= self.max_bytes:
+                return
+            by_age = sorted(self._index.items(), key=lambda item: item[1].get("last_used", 0.0))
+            victims: list[str] = []
+            for track_id, entry in by_age:
+                if total <= self.max_bytes:
+                    break
+                total -= entry["size"]
+                victims.append(track_id)
+        for track_id in victims:
+            self._drop(track_id)
+
+    def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        # Cancelled tasks may never run again at shutdown, so stop their encoders here.
+        for tmp_path, proc in list(self._encoders.items()):
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            self._remove_file(os.path.basename(tmp_path))
+        self._encoders.clear()
+        self._save_index()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = len(self._index)
+        return {
+            "entries": entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "encoding": len(self._encoding),
+        }
@@ -0,0 +1,405 @@
+"""Audio worker processes that run FFmpeg and Ogg demuxing off the gateway process.
+
+The bot starts each worker as ``python -m core.audio_workers <window>`` and
+talks to it over its stdin/stdout with small binary frames. Workers spawn
+FFmpeg, split its Ogg output into Opus packets and stream them back; the
+bot only copies ready packets into the voice client. Each stream may have at
+most ``window`` unacknowledged packets in flight, so a paused guild does not
+make a worker buffer a whole track.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, BinaryIO, Callable
+
+import discord
+
+_HEADER = struct.Struct("!BII")
+
+# Bot -> worker
+OPEN, ACK, CLOSE = 1, 2, 3
+# Worker -> bot
+PACKET, END, HEALTH = 10, 11, 12
+
+HEALTH_INTERVAL_SECONDS = 5.0
+ACK_EVERY = 50
+READ_TIMEOUT_SECONDS = 10.0
+
+
+def _write_frame(stream: BinaryIO, lock: threading.Lock, kind: int, stream_id: int, payload: bytes = b"") -> None:
+    with lock:
+        stream.write(_HEADER.pack(kind, stream_id, len(payload)))
+        if payload:
+            stream.write(payload)
+        stream.flush()
+
+
+def _read_frame(stream: BinaryIO) -> tuple[int, int, bytes] | None:
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    kind, stream_id, length = _HEADER.unpack(header)
+    payload = stream.read(length) if length else b""
+    if len(payload) < length:
+        return None
+    return kind, stream_id, payload
+
+
+# ---------------------------------------------------------------------------
+# Worker process side
+
+
+class _WorkerStream:
+    def __init__(
+        self,
+        stream_id: int,
+        argv: list[str],
+        window: int,
+        send: Callable[[int, int, bytes], None],
+        on_done: Callable[[int, str | None], None],
+    ) -> None:
+        self.stream_id = stream_id
+        self.packets = 0
+        self.credits = threading.Semaphore(window)
+        self.closed = False
+        self._send = send
+        self._on_done = on_done
+        self.process = subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        threading.Thread(target=self._run, name=f"audio-stream-{stream_id}", daemon=True).start()
+
+    def _run(self) -> None:
+        from discord.oggparse import OggStream
+
+        error: str | None = None
+        try:
+            for packet in OggStream(self.process.stdout).iter_packets():  # type: ignore[arg-type]
+                while not self.credits.acquire(timeout=1.0):
+                    if self.closed:
+                        return
+                if self.closed:
+                    return
+                self._send(PACKET, self.stream_id, packet)
+                self.packets += 1
+        except Exception as exc:
+            error = str(exc)
+        finally:
+            self._kill()
+            self._on_done(self.stream_id, None if self.closed else error or "")
+
+    def _kill(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def close(self) -> None:
+        self.closed = True
+        self.credits.release()
+        self._kill()
+
+
+def worker_main(window: int) -> None:
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    # Anything printed must not corrupt the frame stream.
+    sys.stdout = sys.stderr
+    send_lock = threading.Lock()
+    streams: dict[int, _WorkerStream] = {}
+    streams_lock = threading.Lock()
+    started = time.monotonic()
+    totals = {"packets": 0, "errors": 0, "opened": 0}
+
+    def send(kind: int, stream_id: int, payload: bytes = b"") -> None:
+        try:
+            _write_frame(stdout, send_lock, kind, stream_id, payload)
+        except (BrokenPipeError, OSError):
+            os._exit(0)
+
+    def on_done(stream_id: int, error: str | None) -> None:
+        with streams_lock:
+            stream = streams.pop(stream_id, None)
+        if stream is not None:
+            totals["packets"] += stream.packets
+        if error is None:
+            return
+        if error:
+            totals["errors"] += 1
+        send(END, stream_id, json.dumps({"error": error}).encode())
+
+    def report_health() -> None:
+        while True:
+            time.sleep(HEALTH_INTERVAL_SECONDS)
+            with streams_lock:
+                active = len(streams)
+                in_flight = sum(s.packets for s in streams.values())
+            health = {
+                "pid": os.getpid(),
+                "streams": active,
+                "opened": totals["opened"],
+                "packets": totals["packets"] + in_flight,
+                "errors": totals["errors"],
+                "uptime": round(time.monotonic() - started, 1),
+            }
+            send(HEALTH, 0, json.dumps(health).encode())
+
+    threading.Thread(target=report_health, name="audio-worker-health", daemon=True).start()
+
+    while True:
+        frame = _read_frame(stdin)
+        if frame is None:
+            break
+        kind, stream_id, payload = frame
+        if kind == OPEN:
+            argv = json.loads(payload)["argv"]
+            try:
+                stream = _WorkerStream(stream_id, argv, window, send, on_done)
+            except OSError as exc:
+                totals["errors"] += 1
+                send(END, stream_id, json.dumps({"error": str(exc)}).encode())
+                continue
+            totals["opened"] += 1
+            with streams_lock:
+                streams[stream_id] = stream
+        elif kind == ACK:
+            with streams_lock:
+                stream = streams.get(stream_id)
+            if stream is not None:
+                stream.credits.release(int.from_bytes(payload, "big"))
+        elif kind == CLOSE:
+            with streams_lock:
+                stream = streams.get(stream_id)
+            if stream is not None:
+                stream.close()
+
+    # The bot went away; stop every FFmpeg we own.
+    with streams_lock:
+        remaining = list(streams.values())
+    for stream in remaining:
+        stream.close()
+
+
+# ---------------------------------------------------------------------------
+# Bot process side
+
+
+class WorkerAudioSource(discord.AudioSource):
+    """Opus packets produced by an audio worker process."""
+
+    def __init__(self, worker: AudioWorker, stream_id: int) -> None:
+        self.stream_id = stream_id
+        self.packets: queue.Queue[bytes | None] = queue.Queue()
+        # Called once when the source is cleaned up, i.e. its playback ended or was discarded.
+        self.on_cleanup: Callable[[], None] | None = None
+        self._worker = worker
+        self._consumed = 0
+        self._ended = False
+        self._closed = False
+
+    def is_opus(self) -> bool:
+        return True
+
+    def read(self) -> bytes:
+        if self._ended:
+            return b""
+        try:
+            packet = self.packets.get(timeout=READ_TIMEOUT_SECONDS)
+        except queue.Empty:
+            packet = None
+        if packet is None:
+            self._ended = True
+            return b""
+
+        self._consumed += 1
+        if self._consumed % ACK_EVERY == 0:
+            self._worker.send(ACK, self.stream_id, ACK_EVERY.to_bytes(4, "big"))
+        return packet
+
+    def cleanup(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._worker.close_stream(self.stream_id)
+            if self.on_cleanup is not None:
+                self.on_cleanup()
+
+
+class AudioWorker:
+    """One worker process plus the thread that routes its frames to sources."""
+
+    def __init__(self, index: int, window: int) -> None:
+        self.index = index
+        self.health: dict[str, Any] = {}
+        self.last_seen = time.monotonic()
+        self.streams: dict[int, WorkerAudioSource] = {}
+        self._send_lock = threading.Lock()
+        self._streams_lock = threading.Lock()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "core.audio_workers", str(window)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+        threading.Thread(target=self._read_loop, name=f"audio-worker-{index}-reader", daemon=True).start()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def send(self, kind: int, stream_id: int, payload: bytes = b"") -> None:
+        try:
+            _write_frame(self.process.stdin, self._send_lock, kind, stream_id, payload)  # type: ignore[arg-type]
+        except (BrokenPipeError, OSError):
+            pass
+
+    def open_stream(self, stream_id: int, argv: list[str]) -> WorkerAudioSource:
+        source = WorkerAudioSource(self, stream_id)
+        with self._streams_lock:
+            self.streams[stream_id] = source
+        self.send(OPEN, stream_id, json.dumps({"argv": argv}).encode())
+        return source
+
+    def close_stream(self, stream_id: int) -> None:
+        with self._streams_lock:
+            source = self.streams.pop(stream_id, None)
+        if source is not None:
+            self.send(CLOSE, stream_id)
+
+    def _read_loop(self) -> None:
+        stdout = self.process.stdout
+        while True:
+            frame = _read_frame(stdout) if stdout else None  # type: ignore[arg-type]
+            if frame is None:
+                break
+            kind, stream_id, payload = frame
+            if kind == PACKET:
+                with self._streams_lock:
+                    source = self.streams.get(stream_id)
+                if source is not None:
+                    source.packets.put(payload)
+            elif kind == END:
+                with self._streams_lock:
+                    source = self.streams.pop(stream_id, None)
+                if source is not None:
+                    error = json.loads(payload).get("error")
+                    if error:
+                        print(f"Audio worker {self.index} stream {stream_id} failed: {error}")
+                    source.packets.put(None)
+            elif kind == HEALTH:
+                self.health = json.loads(payload)
+                self.last_seen = time.monotonic()
+
+        print(f"Audio worker {self.index} (pid {self.process.pid}) stopped")
+        with self._streams_lock:
+            orphans = list(self.streams.values())
+            self.streams.clear()
+        for source in orphans:
+            source.packets.put(None)
+
+    def stop(self) -> None:
+        if self.process.stdin:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class AudioWorkerPool:
+    """Runs audio pipelines in worker processes, keeping each guild on one worker.
+
+    Workers start on first use and a dead worker is restarted in its own
+    slot, so its guilds stay assigned to it. A guild is assigned to the least
+    loaded worker when it opens a stream with none open, and released once
+    all of its streams are cleaned up.
+    """
+
+    def __init__(self, size: int, window: int = 250) -> None:
+        self.size = max(1, size)
+        # Acks are sent every ACK_EVERY packets, so a smaller window would stall.
+        self.window = max(window, ACK_EVERY * 2)
+        self.restarts = 0
+        self._workers: list[AudioWorker | None] = [None] * self.size
+        self._assignments: dict[int, int] = {}
+        self._open_streams: Counter[int] = Counter()
+        self._stream_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _worker(self, index: int) -> AudioWorker:
+        worker = self._workers[index]
+        if worker is None or not worker.alive:
+            if worker is not None:
+                self.restarts += 1
+            worker = self._workers[index] = AudioWorker(index, self.window)
+        return worker
+
+    def _pick(self, guild_id: int | None) -> int:
+        if guild_id is not None and guild_id in self._assignments:
+            return self._assignments[guild_id]
+        loads = [len(w.streams) if w is not None and w.alive else 0 for w in self._workers]
+        index = loads.index(min(loads))
+        if guild_id is not None:
+            self._assignments[guild_id] = index
+        return index
+
+    def open_stream(self, argv: list[str], guild_id: int | None = None) -> WorkerAudioSource:
+        with self._lock:
+            worker = self._worker(self._pick(guild_id))
+            source = worker.open_stream(next(self._stream_ids), argv)
+            if guild_id is not None:
+                self._open_streams[guild_id] += 1
+                source.on_cleanup = lambda: self._release(guild_id)
+            return source
+
+    def _release(self, guild_id: int) -> None:
+        with self._lock:
+            self._open_streams[guild_id] -= 1
+            if self._open_streams[guild_id] <= 0:
+                del self._open_streams[guild_id]
+                self._assignments.pop(guild_id, None)
+
+    def close(self) -> None:
+        with self._lock:
+            for worker in self._workers:
+                if worker is not None:
+                    worker.stop()
+            self._workers = [None] * self.size
+            self._assignments.clear()
+            self._open_streams.clear()
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        workers = []
+        for index, worker in enumerate(self._workers):
+            if worker is None:
+                workers.append({"index": index, "running": False})
+                continue
+            workers.append(
+                {
+                    "index": index,
+                    "running": worker.alive,
+                    "streams": len(worker.streams),
+                    "guilds": sum(1 for assigned in self._assignments.values() if assigned == index),
+                    "heartbeat_age": round(now - worker.last_seen, 1),
+                    "health": worker.health,
+                }
+            )
+        return {"size": self.size, "restarts": self.restarts, "workers": workers}
+
+
+if __name__ == "__main__":
+    worker_main(int(sys.argv[1]) if len(sys.argv) > 1 else 250)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU cache whose entries expire after a per-entry TTL.
+
+    Expired entries are kept for a further stale_ttl seconds so get_stale()
+    can still serve them while the source is unavailable.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = 300.0, stale_ttl: float = 0.0) -> None:
+        self.max_size = max(0, max_size)
+        self.ttl = ttl
+        self.stale_ttl = max(0.0, stale_ttl)
+        self.stale_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> V | None:
+        """Return a live value and mark it most recently used, or None on miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: float | None = None) -> None:
+        """Store a value, evicting least recently used entries past max_size."""
+        if self.max_size <= 0:
+            return
+
+        lifetime = self.ttl if ttl is None else ttl
+        if lifetime <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + lifetime, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_stale(self, key: Hashable) -> V | None:
+        """Return a value even if expired, as long as it is within stale_ttl."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] + self.stale_ttl <= time.monotonic():
+            return None
+        self.stale_hits += 1
+        return entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -1,38 +1,186 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import time
+from typing import Any
 
 import discord
 from discord.ext import commands
 
+from core.metrics import RollingStats
 
-async def _delete_later(message: discord.Message, delay: int) -> None:
-    await asyncio.sleep(delay)
-    try:
-        await message.delete()
-    except (discord.Forbidden, discord.NotFound):
-        pass
+# Discord accepts at most this many message IDs per bulk delete.
+BULK_DELETE_LIMIT = 100
+# How long a channel where bulk delete was forbidden gets single deletes before trying bulk again.
+BULK_FORBIDDEN_RETRY_SECONDS = 3600.0
 
 
 def make_embed(description: str, title: str | None = None) -> discord.Embed:
     return discord.Embed(title=title, description=description)
 
 
+class MessageCleanupScheduler:
+    """Deletes messages after a delay from a single timer task.
+
+    Pending deletions live in one heap instead of a sleeping task each. Due
+    messages are grouped per channel and removed with one bulk delete when
+    there are several, using partial messages so nothing is fetched first.
+    Each channel (Discord's rate-limit bucket for deletes) has at most one
+    request in flight; messages that come due meanwhile join its next batch.
+    """
+
+    def __init__(self, bot: commands.Bot, max_concurrent_channels: int = 4) -> None:
+        self.bot = bot
+        self.deleted = 0
+        self.bulk_requests = 0
+        self.failed = 0
+        self.lag_ms = RollingStats()
+        self._heap: list[tuple[float, int, int]] = []
+        self._ready: dict[int, list[tuple[float, int]]] = {}
+        self._busy: set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max(1, max_concurrent_channels))
+        self._task: asyncio.Task | None = None
+        self._workers: set[asyncio.Task] = set()
+        # Channels where bulk delete was forbidden (no Manage Messages), until when to skip it.
+        self._bulk_forbidden: dict[int, float] = {}
+
+    @property
+    def depth(self) -> int:
+        return len(self._heap) + sum(len(items) for items in self._ready.values())
+
+    def schedule(self, channel_id: int, message_id: int, delay: float) -> None:
+        due = time.monotonic() + delay
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (due, channel_id, message_id))
+        if earliest is None or due < earliest:
+            self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = self.bot.loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            delay = self._heap[0][0] - now
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            while self._heap and self._heap[0][0] <= now:
+                due, channel_id, message_id = heapq.heappop(self._heap)
+                self._ready.setdefault(channel_id, []).append((due, message_id))
+            for channel_id in list(self._ready):
+                if channel_id not in self._busy:
+                    self._busy.add(channel_id)
+                    worker = self.bot.loop.create_task(self._drain_channel(channel_id))
+                    self._workers.add(worker)
+                    worker.add_done_callback(self._workers.discard)
+
+    async def _drain_channel(self, channel_id: int) -> None:
+        try:
+            while channel_id in self._ready:
+                items = self._ready.pop(channel_id)
+                now = time.monotonic()
+                for due, _ in items:
+                    self.lag_ms.add((now - due) * 1000)
+                async with self._slots:
+                    await self._delete_batch(channel_id, [message_id for _, message_id in items])
+        finally:
+            self._busy.discard(channel_id)
+
+    async def _delete_batch(self, channel_id: int, message_ids: list[int]) -> None:
+        channel = self.bot.get_channel(channel_id)
+        if channel is None or not hasattr(channel, "get_partial_message"):
+            return
+
+        if len(message_ids) >= 2 and hasattr(channel, "delete_messages") and self._bulk_allowed(channel_id):
+            remaining: list[int] = []
+            for start in range(0, len(message_ids), BULK_DELETE_LIMIT):
+                chunk = message_ids[start : start + BULK_DELETE_LIMIT]
+                if channel_id in self._bulk_forbidden:
+                    remaining.extend(chunk)
+                    continue
+                try:
+                    await channel.delete_messages([discord.Object(id=message_id) for message_id in chunk])  # type: ignore[attr-defined]
+                except discord.Forbidden:
+                    # Bulk delete needs Manage Messages; without it every batch would
+                    # fail first, so go straight to single deletes for a while.
+                    self._bulk_forbidden[channel_id] = time.monotonic() + BULK_FORBIDDEN_RETRY_SECONDS
+                    remaining.extend(chunk)
+                    continue
+                except discord.HTTPException:
+                    # Fails outright if any message is already gone; fall back to one-by-one.
+                    remaining.extend(chunk)
+                    continue
+                self.bulk_requests += 1
+                self.deleted += len(chunk)
+            message_ids = remaining
+
+        for message_id in message_ids:
+            try:
+                await channel.get_partial_message(message_id).delete()  # type: ignore[attr-defined]
+            except discord.NotFound:
+                continue
+            except (discord.Forbidden, discord.HTTPException):
+                self.failed += 1
+                continue
+            self.deleted += 1
+
+    def _bulk_allowed(self, channel_id: int) -> bool:
+        until = self._bulk_forbidden.get(channel_id)
+        if until is None:
+            return True
+        if time.monotonic() >= until:
+            del self._bulk_forbidden[channel_id]
+            return True
+        return False
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        for worker in list(self._workers):
+            worker.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        lag = self.lag_ms.summary()
+        return {
+            "depth": self.depth,
+            "deleted": self.deleted,
+            "bulk_requests": self.bulk_requests,
+            "failed": self.failed,
+            "lag_ms_avg": lag["avg"],
+            "lag_ms_p95": lag["p95"],
+            "lag_ms_max": lag["max"],
+        }
+
+
+def _cleanup_scheduler(bot: commands.Bot) -> MessageCleanupScheduler:
+    scheduler = getattr(bot, "cleanup_scheduler", None)
+    if scheduler is None:
+        scheduler = MessageCleanupScheduler(bot)
+        bot.cleanup_scheduler = scheduler  # type: ignore[attr-defined]
+    return scheduler
+
+
 async def delete_message_by_id(bot: commands.Bot, channel_id: int | None, message_id: int | None) -> None:
     if not channel_id or not message_id:
         return
 
     channel = bot.get_channel(channel_id)
-    if channel is None or not hasattr(channel, "fetch_message"):
-        return
-
-    try:
-        message = await channel.fetch_message(message_id)  # type: ignore[attr-defined]
-    except (discord.NotFound, discord.Forbidden):
+    if channel is None or not hasattr(channel, "get_partial_message"):
         return
 
     try:
-        await message.delete()
+        await channel.get_partial_message(message_id).delete()  # type: ignore[attr-defined]
     except (discord.NotFound, discord.Forbidden):
         return
 
@@ -48,7 +196,7 @@ def schedule_message_delete(bot: commands.Bot, message: discord.Message | None)
     if delay <= 0:
         return
 
-    bot.loop.create_task(_delete_later(message, delay))
+    _cleanup_scheduler(bot).schedule(message.channel.id, message.id, delay)
 
 
 def schedule_command_cleanup(ctx: commands.Context, reply_message: discord.Message | None) -> None:
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Generic, Hashable, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Coalesces concurrent calls for the same key into one in-flight task."""
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._inflight: dict[Hashable, asyncio.Task[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await the in-flight call for key, starting it with factory if there is none."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, k=key: self._forget(k, done))
+        else:
+            self.coalesced += 1
+
+        # Shielded so one cancelled awaiter does not cancel the call for everyone else.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every awaiter was cancelled.
+            task.exception()
+
+
+async def ordered_fanout(
+    factories: Sequence[Callable[[], Awaitable[T | None]]],
+    limit: int,
+    timeout: float,
+) -> AsyncIterator[T | None]:
+    """Run factories concurrently and yield their results in input order.
+
+    At most `limit` calls run at once, each bounded by `timeout`. Calls that
+    time out or raise yield None so one bad item never stalls the rest.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(factory: Callable[[], Awaitable[T | None]]) -> T | None:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(factory(), timeout)
+            except asyncio.TimeoutError:
+                return None
+            except Exception as exc:
+                print(f"Fan-out call failed: {exc}")
+                return None
+
+    tasks = [asyncio.ensure_future(run(factory)) for factory in factories]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
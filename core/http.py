@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Any
+
+import aiohttp
+
+from core.jsonutil import loads
+
+# Status codes worth retrying: the upstream is overloaded or briefly broken.
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Longest single wait between retries, including a server's Retry-After.
+MAX_BACKOFF_SECONDS = 5.0
+
+
+class UpstreamUnavailable(Exception):
+    """The API could not be reached or kept failing after retries."""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """The circuit breaker is open, so the request was not sent."""
+
+
+def create_session(
+    pool_size: int = 100,
+    per_host: int = 20,
+    dns_cache_ttl: int = 300,
+    keepalive_timeout: float = 30.0,
+    connect_timeout: float = 3.0,
+    read_timeout: float = 8.0,
+    total_timeout: float = 20.0,
+) -> aiohttp.ClientSession:
+    """A session with a bounded keep-alive pool, cached DNS and split timeouts."""
+    connector = aiohttp.TCPConnector(
+        limit=pool_size,
+        limit_per_host=per_host,
+        ttl_dns_cache=dns_cache_ttl,
+        keepalive_timeout=keepalive_timeout,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=total_timeout,
+        connect=connect_timeout,
+        sock_connect=connect_timeout,
+        sock_read=read_timeout,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures instead of waiting on timeouts.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    are refused for reset_timeout seconds. Then a single trial call is let
+    through; its success closes the circuit and its failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_started: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        now = time.monotonic()
+        # A trial that never reported back (e.g. cancelled) does not block the next one forever.
+        if state == "half-open" and (self._trial_started is None or now - self._trial_started >= self.reset_timeout):
+            self._trial_started = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        trial_failed = self._trial_started is not None
+        if trial_failed or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.times_opened += 1
+            self.opened_at = time.monotonic()
+        self._trial_started = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+def retry_delay(attempt: int, backoff: float, retry_after: str | None = None) -> float:
+    if retry_after and retry_after.replace(".", "", 1).isdigit():
+        return min(float(retry_after), MAX_BACKOFF_SECONDS)
+    # Full jitter keeps many guilds from retrying in lockstep.
+    return random.uniform(0, min(backoff * 2**attempt, MAX_BACKOFF_SECONDS))
+
+
+async def get_json(
+    session: aiohttp.ClientSession,
+    url: str,
+    retries: int = 2,
+    backoff: float = 0.25,
+    breaker: CircuitBreaker | None = None,
+) -> dict[str, Any] | None:
+    """GET a JSON document, retrying transient failures with jittered backoff.
+
+    Returns None for responses that retrying cannot fix (e.g. 404). Raises
+    UpstreamUnavailable when every attempt failed and CircuitOpenError when
+    the breaker refused the call.
+    """
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpenError(f"circuit open for {url.split('?', 1)[0]}")
+
+    last_error = "no attempts made"
+    for attempt in range(retries + 1):
+        retry_after: str | None = None
+        try:
+            async with session.get(url) as resp:
+                if resp.status == 200:
+                    payload: dict[str, Any] = loads(await resp.read())
+                    if breaker is not None:
+                        breaker.record_success()
+                    return payload
+                if resp.status not in RETRYABLE_STATUSES:
+                    if breaker is not None:
+                        # The upstream answered; it is up even if it did not like the request.
+                        breaker.record_success()
+                    return None
+                last_error = f"HTTP {resp.status}"
+                retry_after = resp.headers.get("Retry-After")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+            last_error = str(exc) or type(exc).__name__
+
+        if attempt < retries:
+            await asyncio.sleep(retry_delay(attempt, backoff, retry_after))
+
+    if breaker is not None:
+        breaker.record_failure()
+    raise UpstreamUnavailable(last_error)
@@ -1,53 +1,238 @@
 from __future__ import annotations
 
-import html
-from typing import Any
-from urllib.parse import urlencode
+import asyncio
+import re
+from typing import Any, AsyncIterator, Callable, Iterable, Sequence
+from urllib.parse import urlencode, urlsplit
 
+from core.cache import TTLCache
+from core.concurrency import SingleFlight, ordered_fanout
+from core.http import UpstreamUnavailable
+from core.mirrors import MirrorPool
 from core.music_state import Track
+from core.ranking import SongRanker
+from core.song_records import SongRecord, normalize_text, parse_songs
+
+# Song IDs sent per /api/songs request.
+SONG_DETAILS_BATCH_SIZE = 50
+# Songs requested per playlist page, and how many pages are fetched at once.
+PLAYLIST_PAGE_SIZE = 50
+PLAYLIST_PAGE_CONCURRENCY = 4
+PLAYLIST_PAGE_TIMEOUT_SECONDS = 15.0
+
+# Path markers of jiosaavn.com links and the kind of item they point at.
+_LINK_KINDS = (
+    ("/song/", "song"),
+    ("/album/", "album"),
+    ("/featured/", "playlist"),
+    ("/playlist/", "playlist"),
+    ("/artist/", "artist"),
+)
+
+
+def link_kind(text: str) -> str | None:
+    """Return "song", "album", "playlist" or "artist" for a JioSaavn link, else None."""
+    parts = urlsplit(text.strip())
+    if parts.scheme not in {"http", "https"} or not parts.netloc.lower().endswith("jiosaavn.com"):
+        return None
+    for marker, kind in _LINK_KINDS:
+        if marker in parts.path:
+            return kind
+    return None
+
+
+def split_play_input(text: str) -> list[str]:
+    """Split /play input into separate queries or links on newlines and semicolons."""
+    return [part.strip() for part in re.split(r"[\n;]", text) if part.strip()]
 
 
 class JioSaavnClient:
-    def __init__(self, base_url: str):
-        self.base_url = base_url.rstrip("/")
+    def __init__(
+        self,
+        base_urls: str | Sequence[str],
+        cache_size: int = 512,
+        cache_ttl: float = 300.0,
+        negative_cache_ttl: float = 30.0,
+        stale_ttl: float = 3600.0,
+        retries: int = 2,
+        breaker_threshold: int = 5,
+        breaker_reset_seconds: float = 30.0,
+        hedge: bool = True,
+    ):
+        if isinstance(base_urls, str):
+            base_urls = base_urls.split(",")
+        self.mirrors = MirrorPool(base_urls, retries, breaker_threshold, breaker_reset_seconds, hedge)
+        self.negative_cache_ttl = negative_cache_ttl
+        # Expired searches are kept for stale_ttl so they can be served while the API is down.
+        self.search_cache: TTLCache[list[SongRecord]] = TTLCache(cache_size, cache_ttl, stale_ttl)
+        self._search_flights: SingleFlight[list[SongRecord]] = SingleFlight()
+        self._songs_flights: SingleFlight[list[dict[str, Any]]] = SingleFlight()
+        self.ranker = SongRanker()
+        # Called with every fresh page of search results, e.g. to feed the autocomplete index.
+        self.record_listeners: list[Callable[[list[SongRecord]], None]] = []
 
     async def search_first_track(self, session, query: str) -> Track | None:
-        results = await self.search_tracks_raw(session, query, limit=20)
-        if not results:
+        records = await self.search_songs(session, query, limit=20)
+        record = self._select_best_song(records, query)
+        if not record:
             return None
+        return record.to_track()
 
-        song = self._select_best_song(results, query)
-        if not song:
-            return None
-        return self.track_from_song(song)
-
-    async def search_tracks_raw(self, session, query: str, limit: int = 20) -> list[dict[str, Any]]:
-        params = urlencode({"query": query, "limit": limit, "page": 0})
-        url = f"{self.base_url}/api/search/songs?{params}"
-        async with session.get(url) as resp:
-            if resp.status != 200:
-                return []
-            payload: dict[str, Any] = await resp.json()
-        if not payload.get("success"):
+    async def search_songs(
+        self,
+        session,
+        query: str,
+        limit: int = 20,
+        page: int = 0,
+    ) -> list[SongRecord]:
+        """Playable search results as song records, cached per normalized query."""
+        normalized = self._normalize_query(query)
+        if not normalized:
             return []
-        return payload.get("data", {}).get("results", []) or []
 
-    def track_from_song(self, song: dict[str, Any]) -> Track | None:
-        stream_url = self._pick_best_url(song.get("downloadUrl") or [])
-        if not stream_url:
-            return None
+        key = (normalized, limit, page)
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            return cached
 
-        artists = song.get("artists", {}).get("primary") or []
-        artist_name = artists[0].get("name", "Unknown Artist") if artists else "Unknown Artist"
+        try:
+            return await self._search_flights.do(
+                key,
+                lambda: self._fetch_search(session, normalized, limit, page),
+            )
+        except UpstreamUnavailable:
+            stale = self.search_cache.get_stale(key)
+            if stale is None:
+                raise
+            return stale
+
+    async def _fetch_search(self, session, query: str, limit: int, page: int) -> list[SongRecord]:
+        results = await self._request_search(session, query, limit, page)
+        for listener in self.record_listeners:
+            listener(results)
+        # Empty results are cached briefly so repeated typos do not hammer the API.
+        self.search_cache.set((query, limit, page), results, None if results else self.negative_cache_ttl)
+        return results
+
+    async def _request_search(self, session, query: str, limit: int, page: int) -> list[SongRecord]:
+        payload = await self._get_json(session, "/api/search/songs", {"query": query, "limit": limit, "page": page})
+        if not payload:
+            return []
+        return parse_songs(payload.get("data", {}).get("results", []) or [])
 
-        return Track(
-            title=html.unescape(song.get("name", "Unknown Title")),
-            stream_url=stream_url,
-            page_url=song.get("url", ""),
-            artist=html.unescape(artist_name),
-            duration=int(song.get("duration") or 0),
-            image_url=self._pick_best_image(song.get("image") or []),
+    async def get_song_by_id(self, session, song_id: str) -> Track | None:
+        tracks = await self.get_songs_by_id(session, [song_id])
+        return tracks.get(song_id)
+
+    async def get_songs_by_id(self, session, song_ids: Iterable[str]) -> dict[str, Track]:
+        """Fetch song details for known IDs, batching many IDs into each request."""
+        ids = list(dict.fromkeys(song_id for song_id in song_ids if song_id))
+        batches = [ids[i : i + SONG_DETAILS_BATCH_SIZE] for i in range(0, len(ids), SONG_DETAILS_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(self._songs_flights.do(tuple(batch), lambda b=batch: self._request_songs(session, b)) for batch in batches)
+        )
+
+        tracks: dict[str, Track] = {}
+        for songs in results:
+            for song in songs:
+                track = self.track_from_song(song)
+                if track and track.song_id:
+                    tracks[track.song_id] = track
+        return tracks
+
+    async def _request_songs(self, session, song_ids: list[str]) -> list[dict[str, Any]]:
+        payload = await self._get_json(session, "/api/songs", {"ids": ",".join(song_ids)})
+        if not payload:
+            return []
+        return payload.get("data") or []
+
+    async def iter_link_tracks(self, session, link: str, max_tracks: int = 500) -> AsyncIterator[Track]:
+        """Yield the playable tracks behind a song, album, playlist or artist link, in order.
+
+        Playlists are paged; the first page is yielded as soon as it arrives
+        and the remaining pages are fetched concurrently behind it.
+        """
+        kind = link_kind(link)
+        songs: list[dict[str, Any]] = []
+        if kind == "song":
+            payload = await self._get_json(session, "/api/songs", {"link": link})
+            songs = (payload or {}).get("data") or []
+        elif kind == "album":
+            payload = await self._get_json(session, "/api/albums", {"link": link})
+            songs = ((payload or {}).get("data") or {}).get("songs") or []
+        elif kind == "artist":
+            songs = await self._request_artist_songs(session, link)
+        elif kind == "playlist":
+            async for track in self._iter_playlist_tracks(session, link, max_tracks):
+                yield track
+            return
+
+        for song in songs[:max_tracks]:
+            track = self.track_from_song(song)
+            if track:
+                yield track
+
+    async def _request_artist_songs(self, session, link: str) -> list[dict[str, Any]]:
+        payload = await self._get_json(session, "/api/artists", {"link": link})
+        artist = (payload or {}).get("data") or {}
+        if artist.get("topSongs"):
+            return artist["topSongs"]
+        if not artist.get("id"):
+            return []
+        payload = await self._get_json(
+            session, f"/api/artists/{artist['id']}/songs", {"page": 0, "sortBy": "popularity"}
         )
+        return ((payload or {}).get("data") or {}).get("songs") or []
+
+    async def _request_playlist_page(self, session, link: str, page: int) -> dict[str, Any]:
+        payload = await self._get_json(
+            session, "/api/playlists", {"link": link, "page": page, "limit": PLAYLIST_PAGE_SIZE}
+        )
+        return (payload or {}).get("data") or {}
+
+    async def _iter_playlist_tracks(self, session, link: str, max_tracks: int) -> AsyncIterator[Track]:
+        first = await self._request_playlist_page(session, link, 0)
+        total = min(int(first.get("songCount") or 0), max_tracks)
+        factories = [
+            lambda page=page: self._request_playlist_page(session, link, page)
+            for page in range(1, -(-total // PLAYLIST_PAGE_SIZE))
+        ]
+
+        async def pages() -> AsyncIterator[dict[str, Any]]:
+            yield first
+            async for data in ordered_fanout(factories, PLAYLIST_PAGE_CONCURRENCY, PLAYLIST_PAGE_TIMEOUT_SECONDS):
+                yield data or {}
+
+        yielded = 0
+        async for data in pages():
+            for song in data.get("songs") or []:
+                if yielded >= max_tracks:
+                    return
+                track = self.track_from_song(song)
+                if track:
+                    yielded += 1
+                    yield track
+
+    async def _get_json(self, session, path: str, params: dict[str, Any]) -> dict[str, Any] | None:
+        """GET an API path and return the payload, or None on a client error or success=false.
+
+        Raises UpstreamUnavailable when the API is down rather than reporting "no results".
+        """
+        payload = await self.mirrors.get_json(session, f"{path}?{urlencode(params)}")
+        if not payload or not payload.get("success"):
+            return None
+        return payload
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "search_cache": self.search_cache.stats(),
+            "ranking": self.ranker.stats(),
+            "mirrors": self.mirrors.stats(),
+        }
+
+    def track_from_song(self, song: dict[str, Any]) -> Track | None:
+        record = SongRecord.from_song(song)
+        return record.to_track() if record else None
 
     async def search_similar_track(
         self,
@@ -56,96 +241,37 @@ class JioSaavnClient:
         exclude_keys: set[str] | None = None,
     ) -> Track | None:
         base_query = f"{seed_track.title} {seed_track.artist}".strip()
-        candidates = await self.search_tracks_raw(session, base_query, limit=20)
+        candidates = await self.search_songs(session, base_query, limit=20)
 
         if not candidates:
-            candidates = await self.search_tracks_raw(session, seed_track.artist, limit=20)
+            candidates = await self.search_songs(session, seed_track.artist, limit=20)
 
         if not candidates:
             return None
 
-        seed_title = self._normalize_text(seed_track.title)
-        seed_artist = self._normalize_text(seed_track.artist)
+        seed_title = normalize_text(seed_track.title)
+        seed_artist = normalize_text(seed_track.artist)
         seed_url = (seed_track.page_url or "").strip()
 
-        filtered: list[dict[str, Any]] = []
-        for song in candidates:
-            name = self._normalize_text(str(song.get("name", "")))
-            primary = song.get("artists", {}).get("primary") or []
-            artist = self._normalize_text(primary[0].get("name", "")) if primary else ""
-            page_url = str(song.get("url", "")).strip()
-
-            if seed_url and page_url == seed_url:
+        filtered: list[SongRecord] = []
+        for record in candidates:
+            if seed_url and record.page_url.strip() == seed_url:
                 continue
-            if name == seed_title and artist == seed_artist:
+            if record.norm_title == seed_title and record.norm_artist == seed_artist:
                 continue
-            if exclude_keys and f"{name}|{artist}" in exclude_keys:
+            if exclude_keys and f"{record.norm_title}|{record.norm_artist}" in exclude_keys:
                 continue
-            filtered.append(song)
-
-        if not filtered:
-            return None
+            filtered.append(record)
 
-        picked = self._select_best_song(filtered, base_query)
+        # Ranked against the artist alone, so a popular song by the same artist wins over covers of the seed.
+        picked = self._select_best_song(filtered, seed_track.artist)
         if not picked:
             return None
-
-        stream_url = self._pick_best_url(picked.get("downloadUrl") or [])
-        if not stream_url:
-            return None
-
-        artists = picked.get("artists", {}).get("primary") or []
-        artist_name = artists[0].get("name", "Unknown Artist") if artists else "Unknown Artist"
-
-        return Track(
-            title=html.unescape(picked.get("name", "Unknown Title")),
-            stream_url=stream_url,
-            page_url=picked.get("url", ""),
-            artist=html.unescape(artist_name),
-            duration=int(picked.get("duration") or 0),
-            image_url=self._pick_best_image(picked.get("image") or []),
-        )
-
-    @staticmethod
-    def _pick_best_url(download_urls: list[dict[str, str]]) -> str | None:
-        if not download_urls:
-            return None
-
-        def quality_value(item: dict[str, str]) -> int:
-            quality = item.get("quality", "")
-            digits = "".join(ch for ch in quality if ch.isdigit())
-            return int(digits) if digits else 0
-
-        best = max(download_urls, key=quality_value)
-        return best.get("url")
-
-    @staticmethod
-    def _normalize_text(text: str) -> str:
-        return "".join(ch.lower() for ch in text if ch.isalnum() or ch.isspace()).strip()
-
-    def _select_best_song(self, songs: list[dict[str, Any]], query: str) -> dict[str, Any] | None:
-        if not songs:
-            return None
-
-        def play_count(song: dict[str, Any]) -> int:
-            play_count = song.get("playCount")
-            if isinstance(play_count, str) and play_count.isdigit():
-                play_count = int(play_count)
-            if not isinstance(play_count, int):
-                play_count = 0
-            return play_count
-
-        return max(songs, key=play_count)
+        return picked.to_track()
 
     @staticmethod
-    def _pick_best_image(images: list[dict[str, str]]) -> str | None:
-        if not images:
-            return None
-
-        def quality_value(item: dict[str, str]) -> int:
-            quality = item.get("quality", "")
-            digits = "".join(ch for ch in quality if ch.isdigit())
-            return int(digits) if digits else 0
+    def _normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
 
-        best = max(images, key=quality_value)
-        return best.get("url")
+    def _select_best_song(self, records: list[SongRecord], query: str) -> SongRecord | None:
+        return self.ranker.best(records, query)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+
+class RollingStats:
+    """Summary statistics over the most recent samples."""
+
+    def __init__(self, window: int = 200) -> None:
+        self.count = 0
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self._samples.append(value)
+
+    def percentile(self, pct: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict[str, Any]:
+        samples = self._samples
+        return {
+            "count": self.count,
+            "avg": (sum(samples) / len(samples)) if samples else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(samples) if samples else 0.0,
+        }
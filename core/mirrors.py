@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Any, Sequence
+
+import aiohttp
+
+from core.http import CircuitBreaker, CircuitOpenError, UpstreamUnavailable, get_json, retry_delay
+from core.metrics import RollingStats
+
+# Weight of the newest sample in the latency and error moving averages.
+EWMA_ALPHA = 0.2
+# Bounds on how long the first request may run before a hedged one is sent.
+HEDGE_MIN_DELAY_SECONDS = 0.05
+HEDGE_MAX_DELAY_SECONDS = 2.0
+# Hedge delay used until a mirror has enough samples for a p95.
+HEDGE_DEFAULT_DELAY_SECONDS = 1.0
+HEDGE_MIN_SAMPLES = 5
+# Base delay before another round over the mirrors once every one has failed.
+RETRY_BACKOFF_SECONDS = 0.25
+
+
+class Mirror:
+    """One API base URL with its own latency history and circuit breaker."""
+
+    def __init__(self, base_url: str, breaker: CircuitBreaker) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.breaker = breaker
+        self.latency = RollingStats()
+        self.latency_ewma: float | None = None
+        self.error_ewma = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.breaker.state != "open"
+
+    @property
+    def score(self) -> float:
+        """Expected cost of a request; untried mirrors score 0 so they get sampled."""
+        if self.latency_ewma is None:
+            # Never answered: worth a try only until its first failure.
+            return math.inf if self.failures else 0.0
+        return self.latency_ewma * (1 + 4 * self.error_ewma)
+
+    def record(self, seconds: float | None) -> None:
+        """Record a finished request; None means it failed."""
+        self.requests += 1
+        failed = seconds is None
+        self.error_ewma += EWMA_ALPHA * ((1.0 if failed else 0.0) - self.error_ewma)
+        if failed:
+            self.failures += 1
+            return
+        self.latency.add(seconds)
+        if self.latency_ewma is None:
+            self.latency_ewma = seconds
+        else:
+            self.latency_ewma += EWMA_ALPHA * (seconds - self.latency_ewma)
+
+    def hedge_delay(self) -> float:
+        if len(self.latency) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY_SECONDS
+        return min(HEDGE_MAX_DELAY_SECONDS, max(HEDGE_MIN_DELAY_SECONDS, self.latency.percentile(95)))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "healthy": self.healthy,
+            "latency_ewma_ms": round((self.latency_ewma or 0.0) * 1000, 1),
+            "latency_p95_ms": round(self.latency.percentile(95) * 1000, 1),
+            "error_rate": round(self.error_ewma, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "breaker": self.breaker.stats(),
+        }
+
+
+class MirrorPool:
+    """Routes API GETs to the fastest healthy mirror, hedging slow requests.
+
+    Mirrors are ranked by latency EWMA weighted by recent error rate. If the
+    chosen mirror has not answered within its own p95 latency, the same
+    request is sent to the next mirror and whichever answers first wins. A
+    mirror that fails hands the request to the next one. Once every mirror
+    has failed, the whole round is retried up to `retries` times with
+    jittered backoff; with a single mirror the retries go to it directly.
+    Each mirror then sees one attempt per round, so its breaker threshold is
+    scaled by the number of rounds to trip after as many requests as a
+    single mirror's breaker would.
+    """
+
+    def __init__(
+        self,
+        base_urls: Sequence[str],
+        retries: int = 2,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge: bool = True,
+    ) -> None:
+        urls = [url.strip() for url in base_urls if url.strip()]
+        if not urls:
+            raise ValueError("at least one API base URL is required")
+        if len(urls) > 1:
+            failure_threshold *= retries + 1
+        self.mirrors = [Mirror(url, CircuitBreaker(failure_threshold, reset_timeout)) for url in urls]
+        self.retries = retries
+        self.hedge = hedge
+        self.hedged_requests = 0
+        self.secondary_wins = 0
+
+    @property
+    def healthy_count(self) -> int:
+        return sum(1 for mirror in self.mirrors if mirror.healthy)
+
+    def ranked(self) -> list[Mirror]:
+        """Healthy mirrors, best first."""
+        return sorted((mirror for mirror in self.mirrors if mirror.healthy), key=lambda mirror: mirror.score)
+
+    async def _attempt(self, session: aiohttp.ClientSession, mirror: Mirror, path: str, retries: int) -> dict[str, Any] | None:
+        started = time.perf_counter()
+        try:
+            payload = await get_json(session, f"{mirror.base_url}{path}", retries=retries, breaker=mirror.breaker)
+        except CircuitOpenError:
+            raise
+        except UpstreamUnavailable:
+            mirror.record(None)
+            raise
+        mirror.record(time.perf_counter() - started)
+        return payload
+
+    async def get_json(self, session: aiohttp.ClientSession, path: str) -> dict[str, Any] | None:
+        """GET path (including its query string) from the best mirror available."""
+        if len(self.mirrors) == 1:
+            if not self.mirrors[0].healthy:
+                raise CircuitOpenError("every API mirror is failing")
+            return await self._attempt(session, self.mirrors[0], path, self.retries)
+
+        for attempt in range(self.retries + 1):
+            candidates = self.ranked()
+            if not candidates:
+                raise CircuitOpenError("every API mirror is failing")
+            try:
+                return await self._race(session, candidates, path)
+            except UpstreamUnavailable:
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(retry_delay(attempt, RETRY_BACKOFF_SECONDS))
+        raise UpstreamUnavailable("no API mirror answered")
+
+    async def _race(self, session: aiohttp.ClientSession, candidates: list[Mirror], path: str) -> dict[str, Any] | None:
+        """One round: the best mirror first, hedged and failing over to the rest."""
+        order = iter(candidates)
+        running: dict[asyncio.Future, Mirror] = {}
+
+        def launch() -> bool:
+            mirror = next(order, None)
+            if mirror is None:
+                return False
+            running[asyncio.ensure_future(self._attempt(session, mirror, path, 0))] = mirror
+            return True
+
+        launch()
+        primary = next(iter(running.values()))
+        hedge_pending = self.hedge
+        last_error: Exception | None = None
+        try:
+            while running:
+                timeout = primary.hedge_delay() if hedge_pending else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_pending = False
+                    if launch():
+                        self.hedged_requests += 1
+                    continue
+
+                for future in done:
+                    mirror = running.pop(future)
+                    try:
+                        payload = future.result()
+                    except UpstreamUnavailable as exc:
+                        last_error = exc
+                        continue
+                    if mirror is not primary:
+                        self.secondary_wins += 1
+                    return payload
+
+                if not running:
+                    # Everything in flight failed; fail over to the next mirror.
+                    hedge_pending = False
+                    launch()
+        finally:
+            for future in running:
+                future.cancel()
+        raise UpstreamUnavailable(str(last_error) if last_error else "no API mirror answered")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "healthy": self.healthy_count,
+            "hedged_requests": self.hedged_requests,
+            "secondary_wins": self.secondary_wins,
+            "mirrors": [mirror.stats() for mirror in self.mirrors],
+        }
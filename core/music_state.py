@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import asyncio
-import json
-import os
-from collections import deque
-from dataclasses import dataclass
-from typing import Deque, ClassVar
+import time
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Iterable
+
+from core.play_store import JsonPlayCountStore, PlayCountStore
+from core.queue_pages import QueuePages
+from core.track_queue import TrackQueue, TrackTable
 
 
 @dataclass(slots=True)
@@ -18,97 +20,188 @@ class Track:
     image_url: str | None = None
     request_channel_id: int | None = None
     request_message_id: int | None = None
+    requester_id: int | None = None
     play_count: int = 0
+    song_id: str | None = None
+    stream_resolved_at: float = 0.0
+
+    def to_record(self) -> dict[str, Any]:
+        """Compact metadata persisted next to play counts."""
+        return {
+            "title": self.title,
+            "artist": self.artist,
+            "page_url": self.page_url,
+            "song_id": self.song_id,
+            "duration": self.duration,
+            "image_url": self.image_url,
+            "stream_url": self.stream_url,
+            "stream_resolved_at": self.stream_resolved_at,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> Track:
+        return cls(
+            title=record.get("title", "Unknown Title"),
+            stream_url=record.get("stream_url", ""),
+            page_url=record.get("page_url", ""),
+            artist=record.get("artist", "Unknown Artist"),
+            duration=int(record.get("duration") or 0),
+            image_url=record.get("image_url"),
+            song_id=record.get("song_id"),
+            stream_resolved_at=float(record.get("stream_resolved_at") or 0.0),
+        )
+
+
+def track_id_for(track: Track) -> str:
+    """Generate unique ID for a track based on URL."""
+    return track.page_url.split("/")[-1] if "/" in track.page_url else track.title
+
+
+def _queue_key(track: Track) -> tuple[Any, ...]:
+    # Who asked for a track is per entry, so it is part of the interned identity.
+    return (track_id_for(track), track.requester_id, track.request_channel_id, track.request_message_id)
+
+
+# Track metadata shared by every guild's queue.
+TRACK_TABLE = TrackTable(_queue_key)
 
 
 class PlayCountManager:
-    """Manages persistent play count storage across bot restarts."""
+    """Process-wide access to the configured play count store."""
 
     _instance: ClassVar[PlayCountManager | None] = None
-    _data: ClassVar[dict[str, int]] = {}
-    _file_path: ClassVar[str] = "data/play_counts.json"
+    _store: ClassVar[PlayCountStore | None] = None
 
     def __new__(cls) -> PlayCountManager:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._load()
         return cls._instance
 
     @classmethod
-    def _load(cls) -> None:
-        """Load play counts from file."""
-        os.makedirs(os.path.dirname(cls._file_path), exist_ok=True)
-        if os.path.exists(cls._file_path):
-            try:
-                with open(cls._file_path, "r") as f:
-                    cls._data = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                cls._data = {}
-        else:
-            cls._data = {}
+    def configure(cls, store: PlayCountStore) -> None:
+        """Swap in a storage backend, closing the previous one."""
+        if cls._store is not None and cls._store is not store:
+            cls._store.close()
+        cls._store = store
 
     @classmethod
-    def _save(cls) -> None:
-        """Save play counts to file."""
-        os.makedirs(os.path.dirname(cls._file_path), exist_ok=True)
-        with open(cls._file_path, "w") as f:
-            json.dump(cls._data, f, indent=2)
-
-    def increment(self, track_id: str) -> int:
-        """Increment play count for a track and return new count."""
-        self._data[track_id] = self._data.get(track_id, 0) + 1
-        self._save()
-        return self._data[track_id]
-
-    def get(self, track_id: str) -> int:
+    def shutdown(cls) -> None:
+        """Flush and close the store; used on bot shutdown."""
+        if cls._store is not None:
+            cls._store.close()
+            cls._store = None
+
+    @property
+    def store(self) -> PlayCountStore:
+        cls = type(self)
+        if cls._store is None:
+            cls._store = JsonPlayCountStore()
+        return cls._store
+
+    def increment(self, track_id: str, guild_id: int | None = None, user_id: int | None = None) -> int:
+        """Increment play count for a track and return its new global count."""
+        return self.store.record(track_id, guild_id, user_id)
+
+    def get(self, track_id: str, guild_id: int | None = None) -> int:
         """Get play count for a track."""
-        return self._data.get(track_id, 0)
+        return self.store.count(track_id, guild_id)
+
+    def get_counts(self, track_ids: Iterable[str], guild_id: int | None = None) -> dict[str, int]:
+        """Get play counts for several tracks in one lookup."""
+        return self.store.counts(track_ids, guild_id)
 
-    def get_all_sorted(self, limit: int = 100) -> list[tuple[str, int]]:
-        """Get all tracks sorted by play count (highest first)."""
-        sorted_tracks = sorted(self._data.items(), key=lambda x: x[1], reverse=True)
-        return sorted_tracks[:limit]
+    def get_all_sorted(self, limit: int = 100, guild_id: int | None = None) -> list[tuple[str, int]]:
+        """Get tracks sorted by play count (highest first)."""
+        return self.store.top(limit, guild_id)
 
-    def get_top_track_ids(self, limit: int = 10) -> list[str]:
+    def get_top_track_ids(self, limit: int = 10, guild_id: int | None = None) -> list[str]:
         """Get top track IDs by play count."""
-        return [track_id for track_id, _ in self.get_all_sorted(limit)]
+        return [track_id for track_id, _ in self.get_all_sorted(limit, guild_id)]
+
+    def save_track(self, track_id: str, track: Track) -> None:
+        """Persist metadata for a track so it can be replayed without searching."""
+        self.store.save_track(track_id, track.to_record())
+
+    def get_tracks(self, track_ids: Iterable[str]) -> dict[str, Track]:
+        """Rehydrate stored tracks by ID; unknown IDs are left out."""
+        return {
+            track_id: Track.from_record(record)
+            for track_id, record in self.store.get_tracks(track_ids).items()
+        }
+
+
+@dataclass(slots=True)
+class PlayerCommand:
+    """A request for a guild's player actor; waiters receive its result."""
+
+    kind: str
+    payload: Any = None
+    waiters: list[asyncio.Future] = field(default_factory=list)
 
 
 class GuildMusicState:
-    def __init__(self) -> None:
-        self.queue: Deque[Track] = deque()
+    def __init__(self, guild_id: int | None = None) -> None:
+        self.guild_id = guild_id
+        self.queue = TrackQueue(TRACK_TABLE)
+        self.queue_pages = QueuePages(self.queue)
         self.now_playing: Track | None = None
         self.worker_task: asyncio.Task | None = None
+        # Commands for the guild's player actor, which runs in worker_task.
+        self.mailbox: asyncio.Queue[PlayerCommand] = asyncio.Queue()
+        # Background tasks still adding playlist or multi-query results to the queue.
+        self.bulk_enqueue_tasks: set[asyncio.Task] = set()
         self.text_channel_id: int | None = None
         self.now_playing_channel_id: int | None = None
         self.now_playing_message_id: int | None = None
         self.mode_247: bool = False
         self.voice_channel_id: int | None = None
+        self.prefetch_task: asyncio.Task | None = None
+        self.prefetched_track: Track | None = None
+        self.prefetched_source: Any = None
+        self.track_finished_at: float | None = None
+        # Monotonic start of the current track, pushed back by time spent paused.
+        self.playback_started_at: float | None = None
+        self.paused_at: float | None = None
         self.play_count_manager = PlayCountManager()
 
     def get_track_id(self, track: Track) -> str:
         """Generate unique ID for a track based on URL."""
-        return track.page_url.split("/")[-1] if "/" in track.page_url else track.title
+        return track_id_for(track)
+
+    def playback_elapsed(self) -> float:
+        """Seconds of the current track played so far, not counting pauses."""
+        if self.playback_started_at is None:
+            return 0.0
+        now = self.paused_at if self.paused_at is not None else time.monotonic()
+        return now - self.playback_started_at
 
     def record_play(self, track: Track) -> int:
-        """Record a play for a track and return the new play count."""
+        """Record a play for a track and return its new global play count."""
         track_id = self.get_track_id(track)
-        return self.play_count_manager.increment(track_id)
+        self.play_count_manager.save_track(track_id, track)
+        return self.play_count_manager.increment(track_id, self.guild_id, track.requester_id)
 
-    def get_play_count(self, track: Track) -> int:
-        """Get play count for a track."""
+    def get_play_count(self, track: Track, global_scope: bool = False) -> int:
+        """Get play count for a track in this guild, or across all guilds."""
         track_id = self.get_track_id(track)
-        return self.play_count_manager.get(track_id)
+        return self.play_count_manager.get(track_id, None if global_scope else self.guild_id)
+
+    def get_most_played(self, limit: int = 10, global_scope: bool = False) -> list[tuple[str, int]]:
+        """Get (track_id, count) pairs for this guild, or across all guilds."""
+        return self.play_count_manager.get_all_sorted(limit, None if global_scope else self.guild_id)
 
-    def get_most_played_tracks(self, limit: int = 10) -> list[Track]:
-        """Get most played tracks as Track objects (returns empty list - needs to be populated from search)."""
+    def get_most_played_tracks(self, limit: int = 10) -> list[str]:
+        """Get the most played track IDs for this guild, falling back to global history."""
         # This returns track IDs, actual tracks need to be searched/retrieved
-        return self.play_count_manager.get_top_track_ids(limit)
+        track_ids = self.play_count_manager.get_top_track_ids(limit, self.guild_id)
+        if not track_ids and self.guild_id is not None:
+            track_ids = self.play_count_manager.get_top_track_ids(limit)
+        return track_ids
 
     def sort_queue_by_play_count(self) -> None:
-        """Sort the current queue by play count (highest first)."""
-        tracks_with_counts = [(track, self.get_play_count(track)) for track in self.queue]
-        tracks_with_counts.sort(key=lambda x: x[1], reverse=True)
-        self.queue.clear()
-        for track, _ in tracks_with_counts:
-            self.queue.append(track)
+        """Sort the current queue by play count in this guild (highest first)."""
+        counts = self.play_count_manager.get_counts(
+            (self.get_track_id(track) for track in self.queue),
+            self.guild_id,
+        )
+        self.queue.sort(key=lambda track: counts.get(self.get_track_id(track), 0), reverse=True)
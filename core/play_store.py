@@ -0,0 +1,579 @@
+from __future__ import annotations
+
+import abc
+import bisect
+import contextlib
+import heapq
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Iterable, Iterator, TextIO
+
+
+class PlayCountStore(abc.ABC):
+    """Storage backend for play counts.
+
+    A guild_id of None means global counts across every guild.
+    """
+
+    @abc.abstractmethod
+    def record(self, track_id: str, guild_id: int | None = None, user_id: int | None = None) -> int:
+        """Record one play and return the track's new global count."""
+
+    @abc.abstractmethod
+    def count(self, track_id: str, guild_id: int | None = None) -> int:
+        """Return the track's play count."""
+
+    def counts(self, track_ids: Iterable[str], guild_id: int | None = None) -> dict[str, int]:
+        return {track_id: self.count(track_id, guild_id) for track_id in track_ids}
+
+    @abc.abstractmethod
+    def top(self, limit: int, guild_id: int | None = None) -> list[tuple[str, int]]:
+        """Return (track_id, count) pairs, highest count first."""
+
+    @abc.abstractmethod
+    def save_track(self, track_id: str, record: dict[str, Any]) -> None:
+        """Remember compact metadata for a track so it can be replayed without a search."""
+
+    @abc.abstractmethod
+    def get_tracks(self, track_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Return stored metadata records for whichever track_ids are known."""
+
+    def close(self) -> None:
+        pass
+
+
+class CountIndex:
+    """Track ids bucketed by play count, so top-N only walks the highest buckets.
+
+    Increments move an id between neighbouring buckets in O(1) plus a bisect
+    over the distinct counts, which stay few even for huge histories.
+    """
+
+    def __init__(self, counts: dict[str, int] | None = None) -> None:
+        self._buckets: dict[int, dict[str, None]] = {}
+        for track_id, count in (counts or {}).items():
+            if count > 0:
+                self._buckets.setdefault(count, {})[track_id] = None
+        self._levels: list[int] = sorted(self._buckets)
+
+    def move(self, track_id: str, old_count: int, new_count: int) -> None:
+        """Move track_id from the old_count bucket to the new_count bucket."""
+        if old_count > 0:
+            bucket = self._buckets.get(old_count)
+            if bucket is not None:
+                bucket.pop(track_id, None)
+                if not bucket:
+                    del self._buckets[old_count]
+                    del self._levels[bisect.bisect_left(self._levels, old_count)]
+
+        if new_count > 0:
+            bucket = self._buckets.get(new_count)
+            if bucket is None:
+                bucket = self._buckets[new_count] = {}
+                bisect.insort(self._levels, new_count)
+            bucket[track_id] = None
+
+    def top(self, limit: int) -> list[tuple[str, int]]:
+        result: list[tuple[str, int]] = []
+        for count in reversed(self._levels):
+            for track_id in self._buckets[count]:
+                if len(result) >= limit:
+                    return result
+                result.append((track_id, count))
+        return result
+
+
+class JsonPlayCountStore(PlayCountStore):
+    """Global play counts in a JSON snapshot plus an append-only increment log.
+
+    Each play (and each new track metadata record) is appended to the log. The
+    full snapshot is only rewritten by a background compaction, and the log is
+    replayed on load after a crash. Guild and user ids are accepted but not
+    stored; every scope is global.
+    """
+
+    def __init__(
+        self,
+        file_path: str = "data/play_counts.json",
+        log_path: str = "data/play_counts.log",
+        compact_every: int = 500,
+        compact_interval: float = 300.0,
+    ) -> None:
+        self.file_path = file_path
+        self.log_path = log_path
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self.data: dict[str, int] = {}
+        self.tracks: dict[str, dict[str, Any]] = {}
+        self._seq = 0
+        self._pending = 0
+        self._last_compaction = 0.0
+        self._log_file: TextIO | None = None
+        self._log_lock = threading.Lock()
+        self._compaction_thread: threading.Thread | None = None
+        self._index = CountIndex()
+        self._load()
+
+    def _load(self) -> None:
+        """Load the snapshot, then replay any increments logged after it."""
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        snapshot = self._read_snapshot()
+        self.data, self.tracks, self._seq = snapshot or ({}, {}, 0)
+
+        replayed = 0
+        for entry in self._read_log():
+            if entry["s"] <= self._seq:
+                continue
+            track_id = entry["id"]
+            if "m" in entry:
+                self.tracks[track_id] = entry["m"]
+            else:
+                self.data[track_id] = self.data.get(track_id, 0) + 1
+            self._seq = entry["s"]
+            replayed += 1
+
+        # After a corrupt snapshot the log is kept whole until the next
+        # scheduled compaction, so nothing is folded over it at startup.
+        if replayed and snapshot is not None:
+            self._compact(dict(self.data), dict(self.tracks), self._seq)
+        self._index = CountIndex(self.data)
+        self._last_compaction = time.monotonic()
+        self._log_file = open(self.log_path, "a", encoding="utf-8")
+
+    def _read_snapshot(self) -> tuple[dict[str, int], dict[str, dict[str, Any]], int] | None:
+        """Read the snapshot; returns None after moving an unreadable one aside."""
+        if not os.path.exists(self.file_path):
+            return {}, {}, 0
+
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if not isinstance(raw, dict):
+                raise ValueError(f"expected an object, got {type(raw).__name__}")
+            if "counts" in raw and "seq" in raw:
+                return dict(raw["counts"]), dict(raw.get("tracks") or {}), int(raw["seq"])
+        except (OSError, TypeError, ValueError) as exc:
+            corrupt_path = f"{self.file_path}.{int(time.time())}.corrupt"
+            print(f"Play count snapshot {self.file_path} is unreadable ({exc}); moving it to {corrupt_path}")
+            try:
+                os.replace(self.file_path, corrupt_path)
+            except OSError as move_exc:
+                print(f"Failed to move {self.file_path} aside: {move_exc}")
+            return None
+        # Snapshots written before the log existed are a flat {track_id: count} map.
+        return raw, {}, 0
+
+    def _read_log(self) -> list[dict[str, Any]]:
+        if not os.path.exists(self.log_path):
+            return []
+
+        entries: list[dict[str, Any]] = []
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    entry["s"] = int(entry["s"])
+                    entry["id"] = str(entry["id"])
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                    # A torn trailing line from a crash mid-write is skipped.
+                    continue
+                entries.append(entry)
+        return entries
+
+    def _append_log(self, record: dict[str, object]) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._log_lock:
+            if self._log_file is None:
+                self._log_file = open(self.log_path, "a", encoding="utf-8")
+            self._log_file.write(line)
+            self._log_file.flush()
+
+    def _maybe_compact(self) -> None:
+        due = self._pending >= self.compact_every or (
+            self._pending and time.monotonic() - self._last_compaction >= self.compact_interval
+        )
+        if not due:
+            return
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+
+        self._pending = 0
+        self._last_compaction = time.monotonic()
+        self._compaction_thread = threading.Thread(
+            target=self._compact,
+            args=(dict(self.data), dict(self.tracks), self._seq),
+            name="play-count-compaction",
+            daemon=True,
+        )
+        self._compaction_thread.start()
+
+    def _compact(self, counts: dict[str, int], tracks: dict[str, dict[str, Any]], seq: int) -> None:
+        """Atomically write a snapshot up to seq, then drop log entries it covers."""
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": 2, "seq": seq, "counts": counts, "tracks": tracks},
+                f,
+                separators=(",", ":"),
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+
+        with self._log_lock:
+            if self._log_file is not None:
+                self._log_file.close()
+            remaining = [entry for entry in self._read_log() if entry["s"] > seq]
+            tmp_log = f"{self.log_path}.tmp"
+            with open(tmp_log, "w", encoding="utf-8") as f:
+                for entry in remaining:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            os.replace(tmp_log, self.log_path)
+            self._log_file = open(self.log_path, "a", encoding="utf-8")
+
+    def record(self, track_id: str, guild_id: int | None = None, user_id: int | None = None) -> int:
+        old_count = self.data.get(track_id, 0)
+        self.data[track_id] = old_count + 1
+        self._index.move(track_id, old_count, old_count + 1)
+        self._seq += 1
+        self._pending += 1
+        self._append_log({"s": self._seq, "id": track_id})
+        self._maybe_compact()
+        return self.data[track_id]
+
+    def count(self, track_id: str, guild_id: int | None = None) -> int:
+        return self.data.get(track_id, 0)
+
+    def top(self, limit: int, guild_id: int | None = None) -> list[tuple[str, int]]:
+        return self._index.top(limit)
+
+    def save_track(self, track_id: str, record: dict[str, Any]) -> None:
+        if self.tracks.get(track_id) == record:
+            return
+        self.tracks[track_id] = record
+        self._seq += 1
+        self._pending += 1
+        self._append_log({"s": self._seq, "id": track_id, "m": record})
+        self._maybe_compact()
+
+    def get_tracks(self, track_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        return {track_id: self.tracks[track_id] for track_id in track_ids if track_id in self.tracks}
+
+    def close(self) -> None:
+        """Fold the log into the snapshot and close it."""
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            self._compaction_thread.join()
+        if self._pending:
+            self._compact(dict(self.data), dict(self.tracks), self._seq)
+            self._pending = 0
+        with self._log_lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+
+_GLOBAL_SCOPE = 0
+# Retries given to a failing batch on close before its updates are dropped.
+CLOSE_WRITE_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS play_events (
+    id INTEGER PRIMARY KEY,
+    track_id TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_play_events_guild_user ON play_events (guild_id, user_id);
+CREATE INDEX IF NOT EXISTS idx_play_events_track ON play_events (track_id);
+CREATE TABLE IF NOT EXISTS play_counts (
+    guild_id INTEGER NOT NULL,
+    track_id TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, track_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_play_counts_guild_count ON play_counts (guild_id, count DESC);
+CREATE TABLE IF NOT EXISTS tracks (
+    track_id TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS write_seq (seq INTEGER NOT NULL);
+INSERT INTO write_seq (seq) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM write_seq);
+"""
+
+
+class SqlitePlayCountStore(PlayCountStore):
+    """Per-guild and global play counts plus a raw play event log in SQLite.
+
+    Plays and track metadata are queued in memory and written by a background
+    thread in batched transactions. Reads use indexed queries and overlay
+    writes that have not been committed yet, so callers always see their own
+    writes.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/play_counts.db",
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        seed_counts: dict[str, int] | None = None,
+        seed_tracks: dict[str, dict[str, Any]] | None = None,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        self._reader.execute("PRAGMA journal_mode=WAL")
+        self._reader.executescript(_SCHEMA)
+        self._reader.commit()
+        if seed_counts or seed_tracks:
+            self._seed(seed_counts or {}, seed_tracks or {})
+
+        self._events: queue.Queue[tuple[Any, ...] | None] = queue.Queue()
+        self._pending: Counter[tuple[int, str]] = Counter()
+        self._pending_tracks: dict[str, dict[str, Any]] = {}
+        # Deltas of batches being committed, by sequence number.
+        self._in_flight: dict[int, Counter[tuple[int, str]]] = {}
+        self._pending_lock = threading.Lock()
+        self._reader_lock = threading.Lock()
+        (self._write_seq,) = self._reader.execute("SELECT seq FROM write_seq").fetchone()
+        self._writer = threading.Thread(target=self._write_loop, name="play-count-writer", daemon=True)
+        self._writer.start()
+
+    def _seed(self, counts: dict[str, int], tracks: dict[str, dict[str, Any]]) -> None:
+        """Import global counts and track metadata from the JSON store into an empty database."""
+        (existing,) = self._reader.execute("SELECT COUNT(*) FROM play_counts").fetchone()
+        if existing:
+            return
+        now = time.time()
+        with self._reader:
+            self._reader.executemany(
+                "INSERT INTO play_counts (guild_id, track_id, count) VALUES (?, ?, ?)",
+                [(_GLOBAL_SCOPE, track_id, count) for track_id, count in counts.items()],
+            )
+            self._reader.executemany(
+                "INSERT OR REPLACE INTO tracks (track_id, record, updated_at) VALUES (?, ?, ?)",
+                [(track_id, json.dumps(record, separators=(",", ":")), now) for track_id, record in tracks.items()],
+            )
+
+    @staticmethod
+    def _scope(guild_id: int | None) -> int:
+        return _GLOBAL_SCOPE if guild_id is None else guild_id
+
+    def _write_loop(self) -> None:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # A batch that failed to commit is retried, merged with whatever was queued since.
+        failed: list[tuple[Any, ...]] = []
+        stopping = False
+        while not stopping:
+            try:
+                item = self._events.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if failed and self._write_batch(conn, failed):
+                    failed = []
+                continue
+
+            batch = failed
+            while True:
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._events.get_nowait()
+                except queue.Empty:
+                    break
+
+            failed = [] if not batch or self._write_batch(conn, batch) else batch
+
+        for _ in range(CLOSE_WRITE_ATTEMPTS):
+            if not failed:
+                break
+            time.sleep(self.flush_interval)
+            if self._write_batch(conn, failed):
+                failed = []
+        if failed:
+            print(f"Dropped {len(failed)} play store update(s) that could not be written")
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list[tuple[Any, ...]]) -> bool:
+        """Write one batch in a transaction; returns False if it was rolled back."""
+        plays = [item[1:] for item in batch if item[0] == "play"]
+        tracks = {item[1]: item[2] for item in batch if item[0] == "track"}
+        deltas: Counter[tuple[int, str]] = Counter()
+        for track_id, guild_id, _, _ in plays:
+            deltas[(_GLOBAL_SCOPE, track_id)] += 1
+            if guild_id != _GLOBAL_SCOPE:
+                deltas[(guild_id, track_id)] += 1
+
+        seq = self._write_seq + 1
+        with self._pending_lock:
+            self._in_flight[seq] = deltas
+        try:
+            conn.executemany(
+                "INSERT INTO play_events (track_id, guild_id, user_id, played_at) VALUES (?, ?, ?, ?)",
+                plays,
+            )
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO tracks (track_id, record, updated_at) VALUES (?, ?, ?)",
+                [(track_id, json.dumps(record, separators=(",", ":")), now) for track_id, record in tracks.items()],
+            )
+            conn.executemany(
+                "INSERT INTO play_counts (guild_id, track_id, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (guild_id, track_id) DO UPDATE SET count = count + excluded.count",
+                [(guild_id, track_id, delta) for (guild_id, track_id), delta in deltas.items()],
+            )
+            # Readers compare this with _in_flight to tell whether their snapshot holds the batch.
+            conn.execute("UPDATE write_seq SET seq = ?", (seq,))
+            conn.commit()
+        except sqlite3.Error as exc:
+            conn.rollback()
+            with self._pending_lock:
+                del self._in_flight[seq]
+            print(f"Failed to write {len(batch)} play store update(s), will retry: {exc}")
+            return False
+
+        self._write_seq = seq
+        with self._pending_lock:
+            del self._in_flight[seq]
+            self._pending.subtract(deltas)
+            for key in deltas:
+                if self._pending[key] <= 0:
+                    del self._pending[key]
+            for track_id, record in tracks.items():
+                if self._pending_tracks.get(track_id) is record:
+                    del self._pending_tracks[track_id]
+        return True
+
+    @contextlib.contextmanager
+    def _snapshot(self) -> Iterator[tuple[Counter[tuple[int, str]], dict[str, dict[str, Any]]]]:
+        """Open a read transaction and yield the plays and tracks it does not hold yet.
+
+        The writer commits without holding _pending_lock, so the overlay is
+        matched to the snapshot by batch sequence number instead.
+        """
+        with self._reader_lock:
+            conn = self._reader
+            conn.execute("BEGIN")
+            try:
+                with self._pending_lock:
+                    # The first read pins the snapshot; nothing can be retired while we look.
+                    (committed,) = conn.execute("SELECT seq FROM write_seq").fetchone()
+                    pending = Counter(self._pending)
+                    for seq, deltas in self._in_flight.items():
+                        if seq <= committed:
+                            pending.subtract(deltas)
+                    pending_tracks = dict(self._pending_tracks)
+                yield +pending, pending_tracks
+            finally:
+                conn.execute("COMMIT")
+
+    def _db_counts(self, track_ids: list[str], scope: int) -> dict[str, int]:
+        found: dict[str, int] = {}
+        # Chunked to stay under SQLite's bound-parameter limit.
+        for start in range(0, len(track_ids), 500):
+            chunk = track_ids[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._reader.execute(
+                f"SELECT track_id, count FROM play_counts WHERE guild_id = ? AND track_id IN ({placeholders})",
+                [scope, *chunk],
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def record(self, track_id: str, guild_id: int | None = None, user_id: int | None = None) -> int:
+        scope = self._scope(guild_id)
+        with self._pending_lock:
+            self._pending[(_GLOBAL_SCOPE, track_id)] += 1
+            if scope != _GLOBAL_SCOPE:
+                self._pending[(scope, track_id)] += 1
+        self._events.put(("play", track_id, scope, user_id, time.time()))
+        return self.count(track_id)
+
+    def count(self, track_id: str, guild_id: int | None = None) -> int:
+        return self.counts([track_id], guild_id).get(track_id, 0)
+
+    def counts(self, track_ids: Iterable[str], guild_id: int | None = None) -> dict[str, int]:
+        scope = self._scope(guild_id)
+        ids = list(dict.fromkeys(track_ids))
+        with self._snapshot() as (pending, _):
+            found = self._db_counts(ids, scope)
+        return {track_id: found.get(track_id, 0) + pending.get((scope, track_id), 0) for track_id in ids}
+
+    def top(self, limit: int, guild_id: int | None = None) -> list[tuple[str, int]]:
+        scope = self._scope(guild_id)
+        with self._snapshot() as (overlay, _):
+            pending = {track_id: delta for (guild_id, track_id), delta in overlay.items() if guild_id == scope}
+            # Fetching len(pending) extra rows guarantees uncommitted plays cannot
+            # push a track we did not fetch into the top `limit`.
+            rows = self._reader.execute(
+                "SELECT track_id, count FROM play_counts WHERE guild_id = ? ORDER BY count DESC LIMIT ?",
+                (scope, limit + len(pending)),
+            ).fetchall()
+            if not pending:
+                return rows[:limit]
+
+            merged = dict(rows)
+            merged.update(self._db_counts([track_id for track_id in pending if track_id not in merged], scope))
+        for track_id, delta in pending.items():
+            merged[track_id] = merged.get(track_id, 0) + delta
+        return heapq.nlargest(limit, merged.items(), key=lambda x: x[1])
+
+    def save_track(self, track_id: str, record: dict[str, Any]) -> None:
+        with self._pending_lock:
+            self._pending_tracks[track_id] = record
+        self._events.put(("track", track_id, record))
+
+    def get_tracks(self, track_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        ids = list(dict.fromkeys(track_ids))
+        found: dict[str, dict[str, Any]] = {}
+        with self._snapshot() as (_, pending_tracks):
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._reader.execute(
+                    f"SELECT track_id, record FROM tracks WHERE track_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for track_id, record in rows:
+                    found[track_id] = json.loads(record)
+        for track_id in ids:
+            if track_id in pending_tracks:
+                found[track_id] = pending_tracks[track_id]
+        return found
+
+    def close(self) -> None:
+        """Flush queued writes and close the database."""
+        self._events.put(None)
+        self._writer.join()
+        self._reader.close()
+
+
+def create_play_count_store(backend: str, db_path: str = "data/play_counts.db") -> PlayCountStore:
+    """Build the store named by backend ("json" or "sqlite")."""
+    backend = backend.strip().lower()
+    if backend == "json":
+        return JsonPlayCountStore()
+    if backend == "sqlite":
+        seed_counts: dict[str, int] | None = None
+        seed_tracks: dict[str, dict[str, Any]] | None = None
+        if not os.path.exists(db_path) and os.path.exists("data/play_counts.json"):
+            legacy = JsonPlayCountStore()
+            seed_counts = dict(legacy.data)
+            seed_tracks = dict(legacy.tracks)
+            legacy.close()
+        return SqlitePlayCountStore(db_path, seed_counts=seed_counts, seed_tracks=seed_tracks)
+    raise ValueError(f"Unknown play count backend: {backend!r}")
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any
+
+from core.track_queue import TrackQueue
+
+QUEUE_PAGE_SIZE = 10
+
+
+class QueuePages:
+    """Rendered pages of a guild queue, kept until the queue changes under them.
+
+    The queue reports the first position each change can affect, so an
+    append only drops the last page while a popleft drops every page. A page
+    is rendered from a slice of the queue, so any page costs O(page size).
+    """
+
+    def __init__(self, queue: TrackQueue, page_size: int = QUEUE_PAGE_SIZE) -> None:
+        self.queue = queue
+        self.page_size = page_size
+        self.hits = 0
+        self.renders = 0
+        self._pages: dict[int, str] = {}
+        queue.listeners.append(self.invalidate_from)
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-len(self.queue) // self.page_size))
+
+    def invalidate_from(self, position: int) -> None:
+        first = position // self.page_size
+        for page in [page for page in self._pages if page >= first]:
+            del self._pages[page]
+
+    def render(self, page: int) -> str:
+        """Text of a zero-based page, clamped to the pages that exist."""
+        page = max(0, min(page, self.page_count - 1))
+        cached = self._pages.get(page)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        start = page * self.page_size
+        tracks = self.queue.slice(start, start + self.page_size)
+        text = "\n".join(f"{start + i}. {track.title} - {track.artist}" for i, track in enumerate(tracks, start=1))
+        self._pages[page] = text
+        self.renders += 1
+        return text
+
+    def stats(self) -> dict[str, Any]:
+        return {"cached_pages": len(self._pages), "hits": self.hits, "renders": self.renders}
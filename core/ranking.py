@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Sequence
+
+from core.cache import TTLCache
+from core.song_records import SongRecord, normalize_text
+
+# Words that say nothing about which song is meant.
+STOPWORDS = frozenset({"a", "the", "by", "from", "ft", "feat", "and", "song", "official", "audio", "video", "lyrics"})
+# Title words that mark an alternate take; penalized unless the query asks for them.
+VARIANT_WORDS = frozenset(
+    {
+        "remix", "mix", "lofi", "slowed", "reverb", "sped", "karaoke", "instrumental", "cover",
+        "live", "unplugged", "mashup", "acoustic", "reprise", "version", "edit", "extended", "8d",
+    }
+)
+# JioSaavn appends the source film or album to titles, e.g. 'Kesariya (From "Brahmastra")'.
+_FROM_SUFFIX = re.compile(r"\(\s*from\b[^)]*\)", re.IGNORECASE)
+
+COVERAGE_WEIGHT = 0.45
+MATCHED_WEIGHT = 0.15
+PRECISION_WEIGHT = 0.25
+POPULARITY_WEIGHT = 0.15
+EXACT_TITLE_BONUS = 0.1
+VARIANT_PENALTY = 0.15
+# How much a query word counts when it matches each field rather than the title.
+ARTIST_MATCH = 0.8
+ALBUM_MATCH = 0.6
+# Shorter words must match exactly; longer ones may differ by a prefix or one typo.
+FUZZY_MIN_LENGTH = 4
+
+
+def tokenize(text: str) -> tuple[str, ...]:
+    return tuple(token for token in normalize_text(text).split() if token not in STOPWORDS)
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1 :] == b[i + 1 :]
+    return a[i:] == b[i + 1 :]
+
+
+def _matches(token: str, words: frozenset[str]) -> bool:
+    if token in words:
+        return True
+    if len(token) < FUZZY_MIN_LENGTH:
+        return False
+    for word in words:
+        if len(word) >= FUZZY_MIN_LENGTH and (
+            word.startswith(token) or token.startswith(word) or _within_one_edit(token, word)
+        ):
+            return True
+    return False
+
+
+class SongTokens:
+    """Normalized words of one song's title, artists and album."""
+
+    __slots__ = ("title", "title_words", "artist_words", "album_words", "variants")
+
+    def __init__(self, record: SongRecord) -> None:
+        self.title = tokenize(_FROM_SUFFIX.sub(" ", record.title))
+        self.title_words = frozenset(self.title)
+        self.artist_words = frozenset(tokenize(record.artists))
+        self.album_words = frozenset(tokenize(record.album))
+        self.variants = self.title_words & VARIANT_WORDS
+
+
+class SongRanker:
+    """Picks the search result that best matches what the user typed.
+
+    Each candidate is scored on how many query words it covers (title words
+    count most, then artists, then album), how much of its title the query
+    accounts for, and a log-scaled play count prior. Remixes, covers and
+    other alternate takes lose points unless the query names them. Song
+    tokens are cached by song ID since the same songs recur across searches.
+    """
+
+    def __init__(self, token_cache_size: int = 4096) -> None:
+        self._tokens: TTLCache[SongTokens] = TTLCache(token_cache_size, ttl=math.inf)
+
+    def tokens(self, record: SongRecord) -> SongTokens:
+        key = record.song_id or record.page_url
+        if not key:
+            # Songs without an ID or link would all share one cache slot.
+            return SongTokens(record)
+        tokens = self._tokens.get(key)
+        if tokens is None:
+            tokens = SongTokens(record)
+            self._tokens.set(key, tokens)
+        return tokens
+
+    def score(self, query: Sequence[str], tokens: SongTokens, popularity: float) -> float:
+        """Score one candidate; popularity is its play count prior in [0, 1]."""
+        score = POPULARITY_WEIGHT * popularity
+        if not query:
+            return score
+
+        query_words = frozenset(query)
+        covered = 0.0
+        matched = 0
+        for token in query:
+            if _matches(token, tokens.title_words):
+                covered += 1.0
+            elif _matches(token, tokens.artist_words):
+                covered += ARTIST_MATCH
+            elif _matches(token, tokens.album_words):
+                covered += ALBUM_MATCH
+            else:
+                continue
+            matched += 1
+        score += (COVERAGE_WEIGHT * covered + MATCHED_WEIGHT * matched) / len(query)
+
+        if tokens.title:
+            explained = sum(1 for word in tokens.title if _matches(word, query_words))
+            score += PRECISION_WEIGHT * explained / len(tokens.title)
+            if tokens.title_words <= query_words:
+                score += EXACT_TITLE_BONUS
+        if tokens.variants and not tokens.variants & query_words:
+            score -= VARIANT_PENALTY
+        return score
+
+    def rank(self, records: Sequence[SongRecord], query: str) -> list[tuple[float, SongRecord]]:
+        """Records with their scores, best first; ties keep the API's order."""
+        if not records:
+            return []
+        query_tokens = tokenize(query)
+        top = math.log1p(max(record.play_count for record in records)) or 1.0
+        scored = [
+            (self.score(query_tokens, self.tokens(record), math.log1p(record.play_count) / top), -index, record)
+            for index, record in enumerate(records)
+        ]
+        scored.sort(key=lambda item: item[:2], reverse=True)
+        return [(score, record) for score, _, record in scored]
+
+    def best(self, records: Sequence[SongRecord], query: str) -> SongRecord | None:
+        ranked = self.rank(records, query)
+        return ranked[0][1] if ranked else None
+
+    def stats(self) -> dict[str, Any]:
+        return {"token_cache": self._tokens.stats()}
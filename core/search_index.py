@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import sys
+from collections import Counter, OrderedDict
+from operator import attrgetter, itemgetter
+from typing import Any, Iterable
+
+from core.music_state import PlayCountManager, Track
+from core.song_records import SongRecord, normalize_text
+
+# Discord shows at most 25 autocomplete choices, each name and value at most 100 characters.
+MAX_SUGGESTIONS = 25
+CHOICE_MAX_LENGTH = 100
+# A misspelled word matches indexed words sharing at least this fraction of its trigrams.
+TRIGRAM_MIN_OVERLAP = 0.5
+# Words shorter than this are only matched by prefix.
+FUZZY_MIN_LENGTH = 3
+# Prefixes up to this length match too many words to merge per keystroke; their best entries are kept.
+SHORT_PREFIX_LENGTH = 2
+# Multi-word queries whose rarest word has more entries than this are answered best first
+# with an early stop instead of filtering every entry of that word.
+INTERSECT_MAX_ENTRIES = 2_000
+
+
+def _trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _short_prefixes(entry: IndexEntry) -> set[str]:
+    """The empty prefix plus every short prefix of the entry's words."""
+    prefixes = {""}
+    for word in entry.words:
+        for length in range(1, SHORT_PREFIX_LENGTH + 1):
+            prefixes.add(word[:length])
+    return prefixes
+
+
+class IndexEntry:
+    __slots__ = ("key", "label", "value", "words", "plays", "popularity", "rank")
+
+    def __init__(self, key: str, title: str, artist: str, page_url: str) -> None:
+        self.key = key
+        self.label = f"{title} - {artist}"[:CHOICE_MAX_LENGTH]
+        # A song link plays exactly this track; long links fall back to a search.
+        if page_url and len(page_url) <= CHOICE_MAX_LENGTH:
+            self.value = page_url
+        else:
+            self.value = f"{title} {artist}"[:CHOICE_MAX_LENGTH]
+        # Interned so every entry shares one copy of each word with the posting lists.
+        words = dict.fromkeys(normalize_text(f"{title} {artist}").split())
+        self.words = tuple(sys.intern(word) for word in words)
+        self.plays = 0
+        self.popularity = 0.0
+        # Sort key for suggestions: bot plays, then JioSaavn popularity.
+        self.rank = (0, 0.0)
+
+
+class TrackSearchIndex:
+    """In-memory prefix and trigram index over tracks the bot has seen.
+
+    Each query word matches indexed words by prefix through a sorted word
+    list, and the entries matching every word are ranked by how often the
+    bot played them, then by JioSaavn popularity. A single word merges the
+    rank-sorted entry lists of the words it prefixes (re-sorted lazily after
+    changes) and stops once it has enough; one- and two-letter prefixes,
+    which cover too many words for that, keep their best entries up to date
+    as tracks are added. Several words filter the entries of the rarest one,
+    best first when it is common enough for matches to be dense. A query
+    word that matches nothing (usually a typo) is replaced by the indexed
+    words sharing enough character trigrams with it; trigrams are kept per
+    distinct word, not per entry, so the fallback stays small. Lookups never
+    touch the network. Past max_entries, the least recently seen tracks are
+    dropped.
+    """
+
+    def __init__(self, max_entries: int = 20_000) -> None:
+        self.max_entries = max(1, max_entries)
+        self.lookups = 0
+        self.fuzzy_lookups = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, IndexEntry] = OrderedDict()
+        self._words: list[str] = []
+        self._postings: dict[str, set[IndexEntry]] = {}
+        self._trigrams: dict[str, set[str]] = {}
+        # Entries of each indexed word sorted best first, dropped whenever one of them changes.
+        self._ranked: dict[str, list[IndexEntry]] = {}
+        # Best MAX_SUGGESTIONS entries for the empty prefix and each short prefix, best first.
+        self._prefix_top: dict[str, list[IndexEntry]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(
+        self,
+        title: str,
+        artist: str,
+        page_url: str,
+        plays: int | None = None,
+        popularity: float | None = None,
+    ) -> None:
+        """Index a track, or refresh it and mark it recently seen if already indexed."""
+        # Same key as track_id_for, so plays and search results land on one entry.
+        key = page_url.split("/")[-1] if "/" in page_url else title
+        entry = self._entries.get(key)
+        old_rank = None if entry is None else entry.rank
+        if entry is None:
+            entry = IndexEntry(key, title, artist, page_url)
+            self._insert(entry)
+        else:
+            self._entries.move_to_end(key)
+        if popularity is not None:
+            entry.popularity = popularity
+        if plays is not None:
+            entry.plays = plays
+        entry.rank = (entry.plays, entry.popularity)
+        if entry.rank != old_rank:
+            for word in entry.words:
+                self._ranked.pop(word, None)
+            self._update_prefix_tops(entry, old_rank)
+
+        while len(self._entries) > self.max_entries:
+            _, oldest = self._entries.popitem(last=False)
+            self._remove(oldest)
+            self.evictions += 1
+
+    def add_track(self, track: Track, plays: int | None = None) -> None:
+        self.add(track.title, track.artist, track.page_url, plays=plays)
+
+    def add_records(self, records: Iterable[SongRecord]) -> None:
+        for record in records:
+            self.add(record.title, record.artist, record.page_url, popularity=math.log1p(record.play_count))
+
+    def load_history(self, manager: PlayCountManager) -> int:
+        """Index the most played stored tracks, keeping the most played when over capacity."""
+        counts = manager.get_all_sorted(self.max_entries)
+        tracks = manager.get_tracks(track_id for track_id, _ in counts)
+        # Least played first, so the most played end up most recently seen.
+        for track_id, count in reversed(counts):
+            track = tracks.get(track_id)
+            if track is not None:
+                self.add_track(track, plays=count)
+        return len(self._entries)
+
+    def _insert(self, entry: IndexEntry) -> None:
+        self._entries[entry.key] = entry
+        for word in entry.words:
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = set()
+                bisect.insort(self._words, word)
+                for gram in _trigrams(word):
+                    self._trigrams.setdefault(gram, set()).add(word)
+            postings.add(entry)
+
+    def _update_prefix_tops(self, entry: IndexEntry, old_rank: tuple[int, float] | None) -> None:
+        """Keep the cached short prefix lists exact after entry's rank changed."""
+        for prefix in _short_prefixes(entry):
+            top = self._prefix_top.get(prefix)
+            if top is None:
+                continue
+            if entry in top:
+                if old_rank is not None and entry.rank < old_rank:
+                    # Something outside the list may now beat it; rebuild on next use.
+                    del self._prefix_top[prefix]
+                else:
+                    top.sort(key=attrgetter("rank"), reverse=True)
+            elif len(top) < MAX_SUGGESTIONS or entry.rank > top[-1].rank:
+                top.append(entry)
+                top.sort(key=attrgetter("rank"), reverse=True)
+                del top[MAX_SUGGESTIONS:]
+
+    def _remove(self, entry: IndexEntry) -> None:
+        for prefix in _short_prefixes(entry):
+            top = self._prefix_top.get(prefix)
+            if top is not None and entry in top:
+                del self._prefix_top[prefix]
+        for word in entry.words:
+            self._ranked.pop(word, None)
+            postings = self._postings[word]
+            postings.discard(entry)
+            if not postings:
+                del self._postings[word]
+                del self._words[bisect.bisect_left(self._words, word)]
+                for gram in _trigrams(word):
+                    words = self._trigrams[gram]
+                    words.discard(word)
+                    if not words:
+                        del self._trigrams[gram]
+
+    def _prefix_words(self, prefix: str) -> list[str]:
+        words = self._words
+        start = bisect.bisect_left(words, prefix)
+        return words[start : bisect.bisect_left(words, prefix + "\U0010ffff", start)]
+
+    def _fuzzy_words(self, word: str) -> list[str]:
+        if len(word) < FUZZY_MIN_LENGTH:
+            return []
+        grams = _trigrams(word)
+        overlap: Counter[str] = Counter()
+        for gram in grams:
+            overlap.update(self._trigrams.get(gram, ()))
+        needed = len(grams) * TRIGRAM_MIN_OVERLAP
+        return [similar for similar, shared in overlap.items() if shared >= needed]
+
+    def _ranked_entries(self, word: str) -> list[IndexEntry]:
+        ranked = self._ranked.get(word)
+        if ranked is None:
+            ranked = self._ranked[word] = sorted(self._postings[word], key=attrgetter("rank"), reverse=True)
+        return ranked
+
+    def _short_prefix_top(self, prefix: str) -> list[IndexEntry]:
+        top = self._prefix_top.get(prefix)
+        if top is None:
+            if prefix:
+                words = self._prefix_words(prefix)
+                if not words:
+                    return []
+                entries: Iterable[IndexEntry] = set().union(*(self._postings[word] for word in words))
+            else:
+                entries = self._entries.values()
+            top = self._prefix_top[prefix] = heapq.nlargest(MAX_SUGGESTIONS, entries, key=attrgetter("rank"))
+        return top
+
+    def suggest(self, query: str, limit: int = MAX_SUGGESTIONS) -> list[tuple[str, str]]:
+        """(label, value) pairs for a partly typed query, best first."""
+        self.lookups += 1
+        words = list(dict.fromkeys(normalize_text(query).split()))
+        if not words or (len(words) == 1 and len(words[0]) <= SHORT_PREFIX_LENGTH):
+            best = self._short_prefix_top(words[0] if words else "")[:limit]
+            return [(entry.label, entry.value) for entry in best]
+
+        # Indexed words matching each query word: by prefix, or by trigrams for a likely typo.
+        matches: list[list[str]] = []
+        for word in words:
+            found = self._prefix_words(word)
+            if not found:
+                self.fuzzy_lookups += 1
+                found = self._fuzzy_words(word)
+            if not found:
+                return []
+            matches.append(found)
+
+        if len(matches) == 1:
+            best = self._best_of_words(matches[0], limit)
+        else:
+            best = self._best_of_all(matches, limit)
+        return [(entry.label, entry.value) for entry in best]
+
+    def _best_of_words(self, words: list[str], limit: int) -> list[IndexEntry]:
+        """Best entries having any of words, merging their ranked lists until limit are found."""
+        ranked = heapq.merge(*(self._ranked_entries(word) for word in words), key=attrgetter("rank"), reverse=True)
+        best: list[IndexEntry] = []
+        seen: set[IndexEntry] = set()
+        for entry in ranked:
+            if entry not in seen:
+                seen.add(entry)
+                best.append(entry)
+                if len(best) >= limit:
+                    break
+        return best
+
+    def _best_of_all(self, matches: list[list[str]], limit: int) -> list[IndexEntry]:
+        """Best entries having a word from every list in matches."""
+        sized = sorted(
+            ((sum(len(self._postings[word]) for word in found), found) for found in matches),
+            key=itemgetter(0),
+        )
+        size, driver = sized[0]
+        others = [frozenset(found) for _, found in sized[1:]]
+        if size > INTERSECT_MAX_ENTRIES:
+            # Every word is common, so matches are usually dense: walk the rarest
+            # word's entries best first and stop once enough pass the others.
+            best: list[IndexEntry] = []
+            seen: set[IndexEntry] = set()
+            ranked = heapq.merge(
+                *(self._ranked_entries(word) for word in driver), key=attrgetter("rank"), reverse=True
+            )
+            for entry in ranked:
+                if entry in seen:
+                    continue
+                seen.add(entry)
+                if all(not allowed.isdisjoint(entry.words) for allowed in others):
+                    best.append(entry)
+                    if len(best) >= limit:
+                        break
+            return best
+
+        candidates: set[IndexEntry] = set().union(*(self._postings[word] for word in driver))
+        for allowed in others:
+            candidates = {entry for entry in candidates if not allowed.isdisjoint(entry.words)}
+        return heapq.nlargest(limit, candidates, key=attrgetter("rank"))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "words": len(self._words),
+            "trigrams": len(self._trigrams),
+            "lookups": self.lookups,
+            "fuzzy_lookups": self.fuzzy_lookups,
+            "evictions": self.evictions,
+        }
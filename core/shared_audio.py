@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+import discord
+
+# Opus packets are 20 ms each, so 30,000 packets hold ten minutes of audio.
+DEFAULT_MAX_PACKETS = 30_000
+# How long a reader waits for the decoder before treating the stream as finished.
+READ_TIMEOUT_SECONDS = 10.0
+
+
+class SharedStream:
+    """One FFmpeg decode whose Opus packets are kept in a ring buffer for many readers.
+
+    A pump thread drains the underlying source as fast as FFmpeg produces
+    packets. Readers keep their own absolute offsets; a reader that falls
+    behind the ring is moved forward to the oldest packet still held.
+    """
+
+    def __init__(self, key: str, source: discord.AudioSource, max_packets: int = DEFAULT_MAX_PACKETS) -> None:
+        self.key = key
+        self.refs = 0
+        self.released_at: float | None = None
+        self.max_packets = max_packets
+        self._source = source
+        self._packets: deque[bytes] = deque()
+        self._base = 0
+        self._done = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._pump, name=f"shared-audio-{key[-24:]}", daemon=True)
+        self._thread.start()
+
+    @property
+    def has_start(self) -> bool:
+        """Whether the first packet is still buffered, so a new reader can start from the top."""
+        with self._cond:
+            return self._base == 0 and not self._closed
+
+    def _pump(self) -> None:
+        try:
+            while not self._closed:
+                packet = self._source.read()
+                with self._cond:
+                    if not packet:
+                        break
+                    self._packets.append(packet)
+                    if len(self._packets) > self.max_packets:
+                        self._packets.popleft()
+                        self._base += 1
+                    self._cond.notify_all()
+        except Exception as exc:
+            print(f"Shared audio decode failed for {self.key}: {exc}")
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+            self._source.cleanup()
+
+    def read(self, index: int) -> tuple[bytes, int]:
+        """Return the packet at absolute index (or the oldest held) and the index after it."""
+        deadline = time.monotonic() + READ_TIMEOUT_SECONDS
+        with self._cond:
+            while True:
+                index = max(index, self._base)
+                offset = index - self._base
+                if offset < len(self._packets):
+                    return self._packets[offset], index + 1
+                if self._done or self._closed:
+                    return b"", index
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return b"", index
+                self._cond.wait(remaining)
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._packets.clear()
+            self._cond.notify_all()
+        if not self._done:
+            # Stops FFmpeg instead of letting the pump download the rest of the track.
+            self._source.cleanup()
+
+
+class SharedStreamReader(discord.AudioSource):
+    """A voice client's view of a SharedStream, starting from the first packet."""
+
+    def __init__(self, registry: SharedAudioRegistry, stream: SharedStream) -> None:
+        self._registry = registry
+        self._stream = stream
+        self._index = 0
+        self._released = False
+
+    def is_opus(self) -> bool:
+        return True
+
+    def read(self) -> bytes:
+        packet, self._index = self._stream.read(self._index)
+        return packet
+
+    def cleanup(self) -> None:
+        if not self._released:
+            self._released = True
+            self._registry.release(self._stream)
+
+
+class SharedAudioRegistry:
+    """Shares one decode per stream URL across every guild playing it.
+
+    Streams are reference counted. Once the last reader lets go, a stream is
+    kept for a grace period so guilds converging on the same 24/7 track can
+    reuse it, then evicted; the least recently released idle stream is also
+    evicted first when more than max_streams are held.
+    """
+
+    def __init__(
+        self,
+        grace_seconds: float = 60.0,
+        max_streams: int = 64,
+        max_packets: int = DEFAULT_MAX_PACKETS,
+    ) -> None:
+        self.grace_seconds = grace_seconds
+        self.max_streams = max_streams
+        self.max_packets = max_packets
+        self.shared_hits = 0
+        self.decodes = 0
+        self._streams: dict[str, SharedStream] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, create_source: Callable[[], discord.AudioSource]) -> SharedStreamReader:
+        """Return a reader for key, starting a new decode only if none can be shared."""
+        with self._lock:
+            self._evict_locked()
+            stream = self._streams.get(key)
+            if stream is not None and stream.has_start:
+                self.shared_hits += 1
+            else:
+                if stream is not None:
+                    self._drop_locked(stream)
+                stream = SharedStream(key, create_source(), self.max_packets)
+                self._streams[key] = stream
+                self.decodes += 1
+            stream.refs += 1
+            stream.released_at = None
+            return SharedStreamReader(self, stream)
+
+    def release(self, stream: SharedStream) -> None:
+        with self._lock:
+            stream.refs = max(0, stream.refs - 1)
+            if stream.refs == 0:
+                stream.released_at = time.monotonic()
+                if self._streams.get(stream.key) is not stream:
+                    stream.close()
+            self._evict_locked()
+
+    def _drop_locked(self, stream: SharedStream) -> None:
+        if self._streams.get(stream.key) is stream:
+            del self._streams[stream.key]
+        if stream.refs == 0:
+            stream.close()
+
+    def _evict_locked(self) -> None:
+        now = time.monotonic()
+        idle = [s for s in self._streams.values() if s.refs == 0 and s.released_at is not None]
+        for stream in idle:
+            if now - stream.released_at >= self.grace_seconds:
+                self._drop_locked(stream)
+
+        overflow = len(self._streams) - self.max_streams
+        if overflow > 0:
+            idle = sorted(
+                (s for s in self._streams.values() if s.refs == 0 and s.released_at is not None),
+                key=lambda s: s.released_at or 0.0,
+            )
+            for stream in idle[:overflow]:
+                self._drop_locked(stream)
+
+    def close(self) -> None:
+        with self._lock:
+            for stream in list(self._streams.values()):
+                stream.close()
+            self._streams.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "streams": len(self._streams),
+                "readers": sum(s.refs for s in self._streams.values()),
+                "decodes": self.decodes,
+                "shared_hits": self.shared_hits,
+            }
@@ -0,0 +1,160 @@
+"""Slim song records parsed from JioSaavn API payloads.
+
+Search results arrive as deeply nested JSON: every song carries album and
+artist objects, several image sizes and five download qualities. A
+SongRecord keeps only what playback and ranking need, with the best
+stream and image already picked and title/artist normalized once.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+import time
+from functools import lru_cache
+from typing import Any
+
+from core.music_state import Track
+
+_DIGITS = re.compile(r"\d+")
+# Everything that is not a letter, digit or whitespace (underscore counts as punctuation).
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+# The same characters as bytes, for deleting them from ASCII text without the regex.
+_ASCII_PUNCTUATION = bytes(code for code in range(128) if _PUNCTUATION.match(chr(code)))
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and drop punctuation, keeping letters, digits and spaces."""
+    if text.isascii():
+        # Most titles are ASCII; bytes.translate is several times faster than the regex.
+        return text.lower().encode("ascii").translate(None, _ASCII_PUNCTUATION).decode("ascii").strip()
+    return _PUNCTUATION.sub("", text.lower()).strip()
+
+
+# Quality labels come from a small fixed set, so ranks are parsed once each.
+@lru_cache(maxsize=256)
+def quality_rank(quality: str) -> int:
+    """Numeric rank of a quality label such as "320kbps" or "500x500"."""
+    digits = "".join(_DIGITS.findall(quality))
+    return int(digits) if digits else 0
+
+
+def _best_url(options: list[dict[str, Any]]) -> tuple[str | None, int]:
+    best_url: str | None = None
+    best_rank = -1
+    for option in options:
+        rank = quality_rank(option.get("quality") or "")
+        if rank > best_rank:
+            best_url, best_rank = option.get("url"), rank
+    return best_url, max(best_rank, 0)
+
+
+def _unescape(text: str) -> str:
+    if "&" not in text:
+        return text
+    # The API escapes quotes and little else; html.unescape only runs for anything rarer.
+    quoted = text.replace("&quot;", '"').replace("&#039;", "'")
+    return quoted if "&" not in quoted else html.unescape(text)
+
+
+def _play_count(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return 0
+
+
+class SongRecord:
+    """The fields of one API song that Chord uses, plus precomputed match keys."""
+
+    __slots__ = (
+        "song_id",
+        "title",
+        "artist",
+        "artists",
+        "album",
+        "page_url",
+        "duration",
+        "stream_url",
+        "stream_quality",
+        "image_url",
+        "play_count",
+        "norm_title",
+        "norm_artist",
+    )
+
+    def __init__(
+        self,
+        song_id: str | None,
+        title: str,
+        artist: str,
+        page_url: str,
+        duration: int,
+        stream_url: str,
+        stream_quality: int,
+        image_url: str | None,
+        play_count: int,
+        artists: str = "",
+        album: str = "",
+    ) -> None:
+        self.song_id = song_id
+        self.title = title
+        self.artist = artist
+        self.artists = artists or artist
+        self.album = album
+        self.page_url = page_url
+        self.duration = duration
+        self.stream_url = stream_url
+        self.stream_quality = stream_quality
+        self.image_url = image_url
+        self.play_count = play_count
+        self.norm_title = normalize_text(title)
+        self.norm_artist = normalize_text(artist)
+
+    @classmethod
+    def from_song(cls, song: dict[str, Any]) -> SongRecord | None:
+        """Build a record from an API song object; None if it has no stream."""
+        stream_url, stream_quality = _best_url(song.get("downloadUrl") or [])
+        if not stream_url:
+            return None
+
+        primary = (song.get("artists") or {}).get("primary") or []
+        artist = primary[0].get("name", "Unknown Artist") if primary else "Unknown Artist"
+        artists = ", ".join(item["name"] for item in primary if item.get("name"))
+        image_url, _ = _best_url(song.get("image") or [])
+        return cls(
+            song_id=song.get("id"),
+            title=_unescape(song.get("name") or "Unknown Title"),
+            artist=_unescape(artist),
+            page_url=song.get("url") or "",
+            duration=int(song.get("duration") or 0),
+            stream_url=stream_url,
+            stream_quality=stream_quality,
+            image_url=image_url,
+            play_count=_play_count(song.get("playCount")),
+            artists=_unescape(artists),
+            album=_unescape((song.get("album") or {}).get("name") or ""),
+        )
+
+    def to_track(self) -> Track:
+        return Track(
+            title=self.title,
+            stream_url=self.stream_url,
+            page_url=self.page_url,
+            artist=self.artist,
+            duration=self.duration,
+            image_url=self.image_url,
+            song_id=self.song_id,
+            stream_resolved_at=time.time(),
+        )
+
+
+def parse_songs(songs: list[dict[str, Any]]) -> list[SongRecord]:
+    """Records for every playable song in an API result list, in order."""
+    records = []
+    for song in songs:
+        record = SongRecord.from_song(song)
+        if record is not None:
+            records.append(record)
+    return records
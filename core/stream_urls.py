@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import calendar
+import re
+import time
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+from core.cache import TTLCache
+from core.http import UpstreamUnavailable
+from core.jiosaavn import JioSaavnClient
+from core.music_state import Track
+
+# Assumed lifetime of stream URLs that carry no expiry of their own.
+DEFAULT_URL_TTL = 6 * 3600
+# A URL must stay valid this long past the end of the track to be used.
+REFRESH_MARGIN_SECONDS = 60
+
+# Query parameters CDNs use for a plain Unix expiry timestamp.
+_EXPIRY_PARAMS = ("expires", "expiry", "exp", "e")
+# Akamai-style token parameters such as "st=...~exp=1700000000~hmac=...".
+_TOKEN_PARAMS = ("__token__", "hdnts", "hdnea")
+_TOKEN_EXP = re.compile(r"(?:^|[~&])exp=(\d+)")
+
+
+def _timestamp(value: str) -> float | None:
+    if not value.isdigit():
+        return None
+    stamp = float(value)
+    # Some CDNs sign with milliseconds.
+    return stamp / 1000 if stamp > 1e12 else stamp
+
+
+def parse_expiry(url: str) -> float | None:
+    """Return the Unix time a signed URL stops working, or None if it does not say."""
+    params = {key.lower(): value for key, value in parse_qsl(urlsplit(url).query)}
+
+    for name in _EXPIRY_PARAMS:
+        stamp = _timestamp(params.get(name, ""))
+        if stamp is not None:
+            return stamp
+
+    for name in _TOKEN_PARAMS:
+        match = _TOKEN_EXP.search(params.get(name, ""))
+        if match:
+            return _timestamp(match.group(1))
+
+    signed_at, lifetime = params.get("x-amz-date", ""), params.get("x-amz-expires", "")
+    if signed_at and lifetime.isdigit():
+        try:
+            return calendar.timegm(time.strptime(signed_at, "%Y%m%dT%H%M%SZ")) + int(lifetime)
+        except ValueError:
+            return None
+    return None
+
+
+class StreamUrlResolver:
+    """Keeps track stream URLs valid at the moment they are played.
+
+    Tracks are queued with whatever URL they came with, or none at all. Just
+    before a track is played or prefetched, its URL is checked against the
+    expiry parsed from the signed URL and re-resolved by song ID when it
+    would lapse before the track ends.
+    """
+
+    def __init__(
+        self,
+        client: JioSaavnClient,
+        default_ttl: float = DEFAULT_URL_TTL,
+        margin: float = REFRESH_MARGIN_SECONDS,
+        cache_size: int = 4096,
+    ) -> None:
+        self.client = client
+        self.default_ttl = default_ttl
+        self.margin = margin
+        self.refreshes = 0
+        self.failures = 0
+        self.expiry_cache: TTLCache[float] = TTLCache(cache_size, default_ttl)
+
+    def expires_at(self, url: str, resolved_at: float) -> float:
+        cached = self.expiry_cache.get(url)
+        if cached is not None:
+            return cached
+        expiry = parse_expiry(url)
+        if expiry is None:
+            return resolved_at + self.default_ttl
+        self.expiry_cache.set(url, expiry, max(0.0, expiry - time.time()))
+        return expiry
+
+    def is_fresh(self, track: Track) -> bool:
+        """Whether the track's URL stays valid until the track would finish playing."""
+        if not track.stream_url:
+            return False
+        needed = time.time() + track.duration + self.margin
+        return self.expires_at(track.stream_url, track.stream_resolved_at) > needed
+
+    async def ensure(self, session, track: Track) -> bool:
+        """Give track a usable stream URL, re-resolving it if needed; False if none was found."""
+        if self.is_fresh(track):
+            return True
+
+        refreshed: Track | None = None
+        try:
+            if track.song_id:
+                refreshed = await self.client.get_song_by_id(session, track.song_id)
+            else:
+                refreshed = await self.client.search_first_track(session, f"{track.title} {track.artist}")
+        except UpstreamUnavailable as exc:
+            print(f"Could not refresh the stream URL for {track.title}: {exc}")
+        if refreshed is None or not refreshed.stream_url:
+            self.failures += 1
+            return False
+
+        track.stream_url = refreshed.stream_url
+        track.stream_resolved_at = refreshed.stream_resolved_at
+        track.song_id = track.song_id or refreshed.song_id
+        self.refreshes += 1
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "expiry_cache": self.expiry_cache.stats(),
+        }
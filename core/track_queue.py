@@ -0,0 +1,299 @@
+"""Compact guild queues backed by a shared, reference-counted track table.
+
+A queue entry is a single 64-bit reference into a TrackTable, so a track
+queued by many guilds (24/7 refills, shared playlists) is stored once. The
+references live in fixed-size array chunks indexed by a Fenwick tree over
+the chunk lengths, which makes positional lookups O(log n) and keeps
+inserts, removals and moves bounded by the chunk size.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterable, Iterator, overload
+
+if TYPE_CHECKING:
+    from core.music_state import Track
+
+# References per chunk; chunks split at twice this size.
+CHUNK_SIZE = 256
+
+
+class TrackTable:
+    """Interns tracks by key and hands out integer references to them.
+
+    Entries are reference counted and their slots reused once no queue holds
+    them. When an already interned track is interned again with a fresher
+    stream URL, the stored copy picks the URL up.
+    """
+
+    def __init__(self, key: Callable[[Track], Hashable]) -> None:
+        self._key = key
+        self._tracks: list[Track | None] = []
+        self._keys: list[Hashable] = []
+        self._refs = array("I")
+        self._ids: dict[Hashable, int] = {}
+        self._free: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def intern(self, track: Track) -> int:
+        key = self._key(track)
+        ref = self._ids.get(key)
+        if ref is not None:
+            stored = self._tracks[ref]
+            if stored is not track and stored is not None and track.stream_resolved_at > stored.stream_resolved_at:
+                stored.stream_url = track.stream_url
+                stored.stream_resolved_at = track.stream_resolved_at
+            self._refs[ref] += 1
+            return ref
+
+        if self._free:
+            ref = self._free.pop()
+            self._tracks[ref] = track
+            self._keys[ref] = key
+            self._refs[ref] = 1
+        else:
+            ref = len(self._tracks)
+            self._tracks.append(track)
+            self._keys.append(key)
+            self._refs.append(1)
+        self._ids[key] = ref
+        return ref
+
+    def get(self, ref: int) -> Track:
+        track = self._tracks[ref]
+        if track is None:
+            raise KeyError(ref)
+        return track
+
+    def retain(self, ref: int) -> None:
+        self._refs[ref] += 1
+
+    def release(self, ref: int) -> None:
+        self._refs[ref] -= 1
+        if self._refs[ref] == 0:
+            del self._ids[self._keys[ref]]
+            self._tracks[ref] = None
+            self._keys[ref] = None
+            self._free.append(ref)
+
+    def stats(self) -> dict[str, Any]:
+        return {"tracks": len(self._ids), "slots": len(self._tracks), "free": len(self._free)}
+
+
+class TrackQueue:
+    """A deque-like queue of tracks stored as references into a TrackTable.
+
+    Supports the deque operations the player uses plus positional insert,
+    delete and move, cheap slices for paging, and in-place sorting. version
+    increases on every change, and listeners are told the first position a
+    change can have affected so views can invalidate only what moved.
+    """
+
+    def __init__(self, table: TrackTable, tracks: Iterable[Track] = ()) -> None:
+        self.table = table
+        self.version = 0
+        self.listeners: list[Callable[[int], None]] = []
+        self._chunks: list[array] = []
+        self._tree: list[int] = [0]
+        self._size = 0
+        self.extend(tracks)
+
+    # -- Fenwick tree over chunk lengths --------------------------------------
+
+    def _rebuild(self) -> None:
+        tree = [0] * (len(self._chunks) + 1)
+        for i, chunk in enumerate(self._chunks, start=1):
+            tree[i] += len(chunk)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add(self, chunk_index: int, delta: int) -> None:
+        i = chunk_index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, count: int) -> int:
+        total = 0
+        while count > 0:
+            total += self._tree[count]
+            count -= count & -count
+        return total
+
+    def _append_chunk(self, chunk: array) -> None:
+        self._chunks.append(chunk)
+        i = len(self._chunks)
+        # Node i covers chunks (i - lowbit(i), i].
+        self._tree.append(self._prefix(i - 1) - self._prefix(i - (i & -i)) + len(chunk))
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """Return (chunk index, offset) of position index, which must be in range."""
+        pos = 0
+        remaining = index
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= remaining:
+                pos = nxt
+                remaining -= self._tree[nxt]
+            step >>= 1
+        return pos, remaining
+
+    def _normalize(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("queue index out of range")
+        return index
+
+    def _take_ref(self, index: int) -> int:
+        chunk_index, offset = self._locate(self._normalize(index))
+        chunk = self._chunks[chunk_index]
+        ref = chunk.pop(offset)
+        self._size -= 1
+        if chunk:
+            self._add(chunk_index, -1)
+        else:
+            del self._chunks[chunk_index]
+            self._rebuild()
+        return ref
+
+    def _put_ref(self, index: int, ref: int) -> None:
+        index = max(0, min(index if index >= 0 else index + self._size, self._size))
+        if index == self._size:
+            if self._chunks and len(self._chunks[-1]) < CHUNK_SIZE:
+                self._chunks[-1].append(ref)
+                self._add(len(self._chunks) - 1, 1)
+            else:
+                self._append_chunk(array("Q", [ref]))
+            self._size += 1
+            return
+
+        chunk_index, offset = self._locate(index)
+        chunk = self._chunks[chunk_index]
+        chunk.insert(offset, ref)
+        self._size += 1
+        if len(chunk) > CHUNK_SIZE * 2:
+            self._chunks[chunk_index : chunk_index + 1] = [chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]]
+            self._rebuild()
+        else:
+            self._add(chunk_index, 1)
+
+    def _changed(self, position: int) -> None:
+        self.version += 1
+        for listener in self.listeners:
+            listener(max(0, position))
+
+    def _refs(self) -> Iterator[int]:
+        for chunk in self._chunks:
+            yield from chunk
+
+    # -- deque-like API --------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self) -> Iterator[Track]:
+        get = self.table.get
+        for ref in self._refs():
+            yield get(ref)
+
+    @overload
+    def __getitem__(self, index: int) -> Track: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Track]: ...
+
+    def __getitem__(self, index: int | slice) -> Track | list[Track]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.slice(start, stop)
+        chunk_index, offset = self._locate(self._normalize(index))
+        return self.table.get(self._chunks[chunk_index][offset])
+
+    def __delitem__(self, index: int) -> None:
+        index = self._normalize(index)
+        self.table.release(self._take_ref(index))
+        self._changed(index)
+
+    def slice(self, start: int, stop: int) -> list[Track]:
+        """Tracks in [start, stop), touching only the chunks that hold them."""
+        start = max(0, start)
+        stop = min(stop, self._size)
+        if start >= stop:
+            return []
+        chunk_index, offset = self._locate(start)
+        get = self.table.get
+        out: list[Track] = []
+        wanted = stop - start
+        while len(out) < wanted:
+            chunk = self._chunks[chunk_index]
+            out.extend(get(ref) for ref in chunk[offset : offset + wanted - len(out)])
+            chunk_index += 1
+            offset = 0
+        return out
+
+    def append(self, track: Track) -> None:
+        self._put_ref(self._size, self.table.intern(track))
+        self._changed(self._size - 1)
+
+    def appendleft(self, track: Track) -> None:
+        self.insert(0, track)
+
+    def extend(self, tracks: Iterable[Track]) -> None:
+        start = self._size
+        for track in tracks:
+            self._put_ref(self._size, self.table.intern(track))
+        if self._size > start:
+            self._changed(start)
+
+    def insert(self, index: int, track: Track) -> None:
+        index = max(0, min(index if index >= 0 else index + self._size, self._size))
+        self._put_ref(index, self.table.intern(track))
+        self._changed(index)
+
+    def pop(self, index: int = -1) -> Track:
+        if not self._size:
+            raise IndexError("pop from an empty queue")
+        index = self._normalize(index)
+        ref = self._take_ref(index)
+        track = self.table.get(ref)
+        self.table.release(ref)
+        self._changed(index)
+        return track
+
+    def popleft(self) -> Track:
+        return self.pop(0)
+
+    def move(self, src: int, dst: int) -> None:
+        """Move the track at src so it ends up at position dst."""
+        src = self._normalize(src)
+        ref = self._take_ref(src)
+        self._put_ref(dst, ref)
+        self._changed(min(src, max(0, dst)))
+
+    def clear(self) -> None:
+        for ref in self._refs():
+            self.table.release(ref)
+        self._chunks = []
+        self._tree = [0]
+        self._size = 0
+        self._changed(0)
+
+    def sort(self, key: Callable[[Track], Any], reverse: bool = False) -> None:
+        """Stable in-place sort; references are reordered without re-interning."""
+        get = self.table.get
+        refs = sorted(self._refs(), key=lambda ref: key(get(ref)), reverse=reverse)
+        self._chunks = [array("Q", refs[i : i + CHUNK_SIZE]) for i in range(0, len(refs), CHUNK_SIZE)]
+        self._rebuild()
+        self._changed(0)